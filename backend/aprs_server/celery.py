@@ -0,0 +1,16 @@
+"""
+Celery application for aprs_server
+
+Workers are started with ``celery -A aprs_server worker``; task modules are
+discovered from each installed app's ``tasks.py``.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aprs_server.settings')
+
+app = Celery('aprs_server')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
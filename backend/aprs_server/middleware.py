@@ -0,0 +1,26 @@
+"""
+HTTP Middleware
+
+Response compression limited to content that actually shrinks.
+"""
+
+from django.middleware.gzip import GZipMiddleware
+
+# Media types worth gzipping besides text/*; images such as the PNG radar
+# overlays are already compressed
+COMPRESSIBLE_TYPES = frozenset({
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+})
+
+
+class CompressibleGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves already-compressed responses untouched"""
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type.startswith('text/') or content_type in COMPRESSIBLE_TYPES:
+            return super().process_response(request, response)
+        return response
@@ -53,10 +53,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'aprs_server.middleware.CompressibleGZipMiddleware',  # Compresses large radar JSON, skips PNG overlays
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',  # 304s for ETag'd responses, cached ones included
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -157,6 +159,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',  # Allow unauthenticated access for development
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'aprs_server.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 100,
 }
@@ -169,6 +175,12 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Sessions are read from the cache and written through to the database, so
+# most requests skip the django_session query. The default cache is per
+# process; configure a shared CACHES backend when running several workers
+# so cached sessions and settings responses are invalidated everywhere.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 # WebSocket configuration
 CHANNEL_LAYERS = {
     'default': {
@@ -263,11 +275,34 @@ CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_TASK_ROUTES = {
+    'packets.tasks.persist_aprs_packets': {'queue': 'aprs_ingest'},
+}
+CELERY_BEAT_SCHEDULE = {
+    'retire-expired-weather-alerts': {
+        'task': 'weather.tasks.retire_expired_alerts',
+        'schedule': 300.0,  # seconds
+    },
+    'retire-stale-websocket-connections': {
+        'task': 'websockets.tasks.retire_stale_connections',
+        'schedule': 300.0,  # seconds
+    },
+}
 
 # APRS-IS Connection Settings
 APRSIS_SERVER = 'rotate.aprs.net'
 APRSIS_PORT = 14580
 APRSIS_TIMEOUT = 30
+# Queue received packets to Celery workers on the aprs_ingest queue instead of
+# storing them in the web process. Workers broadcast to WebSocket clients, so
+# this needs a shared channel layer (channels_redis) rather than in-memory.
+APRSIS_CELERY_INGEST = False
+# Run APRS-IS sockets in a separate `manage.py aprsis_worker` process (kept up
+# by systemd/supervisord) instead of inside the web process; the web process
+# sends it connect/disconnect requests over the (shared) channel layer. Run
+# exactly one worker; connections held by a web process that stops renewing
+# its lease are released after APRSIS_LEASE_TIMEOUT
+APRSIS_WORKER_PROCESS = False
 
 # Create logs directory if it doesn't exist
 os.makedirs(BASE_DIR / 'logs', exist_ok=True)
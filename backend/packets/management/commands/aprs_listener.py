@@ -2,6 +2,7 @@ import socket
 import json
 import logging
 import asyncio
+import orjson
 from datetime import datetime
 from django.core.management.base import BaseCommand
 from django.utils import timezone
@@ -14,6 +15,20 @@ from weather.models import WeatherObservation
 logger = logging.getLogger(__name__)
 
 
+def prerendered(message):
+    """Channel layer event carrying the client frame already encoded"""
+    return {'type': message['type'], 'frame': orjson.dumps(message).decode()}
+
+
+# Parser keys already stored as APRSPacket columns, left out of parsed_data
+PACKET_COLUMN_KEYS = frozenset({'source_callsign', 'packet_type', 'raw_packet', 'timestamp'})
+
+
+def packet_parsed_data(parsed):
+    """Parser output to store as APRSPacket.parsed_data, without the column keys"""
+    return {key: value for key, value in parsed.items() if key not in PACKET_COLUMN_KEYS}
+
+
 class APRSParser:
     """APRS packet parser"""
     
@@ -237,22 +252,27 @@ class Command(BaseCommand):
             self.stdout.write(f"Server response: {response.strip()}")
             
             # Process packets
-            buffer = ""
+            buffer = bytearray()
             while True:
                 try:
-                    data = sock.recv(1024).decode('utf-8', errors='ignore')
+                    data = sock.recv(65536)
                     if not data:
                         break
                     
-                    buffer += data
+                    buffer.extend(data)
                     
-                    # Process complete lines
-                    while '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        line = line.strip()
+                    # Process complete lines, decoding each one on its own
+                    start = 0
+                    while True:
+                        end = buffer.find(b'\n', start)
+                        if end < 0:
+                            break
+                        line = buffer[start:end].decode('utf-8', errors='ignore').strip()
+                        start = end + 1
                         
                         if line and not line.startswith('#'):
                             self.process_packet(line, channel_layer)
+                    del buffer[:start]
                             
                 except KeyboardInterrupt:
                     self.stdout.write(self.style.SUCCESS('Shutting down...'))
@@ -282,7 +302,7 @@ class Command(BaseCommand):
                 packet_type=parsed['packet_type'],
                 timestamp=timezone.now(),
                 raw_packet=raw_packet,
-                parsed_data=parsed
+                parsed_data=packet_parsed_data(parsed)
             )
             
             # Update or create station if position packet
@@ -304,7 +324,7 @@ class Command(BaseCommand):
                 if channel_layer:
                     async_to_sync(channel_layer.group_send)(
                         'aprs_stations',
-                        {
+                        prerendered({
                             'type': 'station_update',
                             'station': {
                                 'id': station.id,
@@ -313,11 +333,12 @@ class Command(BaseCommand):
                                 'longitude': station.longitude,
                                 'symbol_table': station.symbol_table,
                                 'symbol_code': station.symbol_code,
-                                'last_heard': station.last_heard.isoformat(),
+                                'last_heard': station.last_heard,
                                 'last_comment': station.last_comment,
                                 'station_type': station.station_type,
-                            }
-                        }
+                            },
+                            'timestamp': timezone.now()
+                        })
                     )
             
             # Process weather data
@@ -344,36 +365,38 @@ class Command(BaseCommand):
                     if channel_layer:
                         async_to_sync(channel_layer.group_send)(
                             'aprs_weather',
-                            {
+                            prerendered({
                                 'type': 'weather_update',
-                                'weather': {
+                                'data': {
                                     'id': weather_obs.id,
                                     'station_callsign': weather_obs.station_callsign,
-                                    'observation_time': weather_obs.observation_time.isoformat(),
+                                    'observation_time': weather_obs.observation_time,
                                     'temperature': weather_obs.temperature,
                                     'humidity': weather_obs.humidity,
                                     'pressure': weather_obs.pressure,
                                     'wind_speed': weather_obs.wind_speed,
                                     'wind_direction': weather_obs.wind_direction,
-                                }
-                            }
+                                },
+                                'timestamp': timezone.now()
+                            })
                         )
             
             # Broadcast packet update via WebSocket
             if channel_layer:
                 async_to_sync(channel_layer.group_send)(
                     'aprs_packets',
-                    {
+                    prerendered({
                         'type': 'packet_update',
                         'packet': {
                             'id': packet.id,
                             'source_callsign': packet.source_callsign,
                             'packet_type': packet.packet_type,
-                            'timestamp': packet.timestamp.isoformat(),
+                            'timestamp': packet.timestamp,
                             'raw_packet': packet.raw_packet,
                             'parsed_data': packet.parsed_data,
-                        }
-                    }
+                        },
+                        'timestamp': timezone.now()
+                    })
                 )
             
             # Log packet processing
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:40
+
+from django.db import migrations
+
+
+def create_parsed_data_gin(apps, schema_editor):
+    # jsonb_path_ops serves parsed_data__contains lookups with a smaller
+    # index than the default operator class
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS packet_parsed_gin '
+        'ON packets_aprspacket USING gin (parsed_data jsonb_path_ops)'
+    )
+
+
+def drop_parsed_data_gin(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS packet_parsed_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_parsed_data_gin, drop_parsed_data_gin),
+    ]
@@ -0,0 +1,134 @@
+"""
+Packet Tasks
+
+Background persistence for packets received from APRS-IS.
+"""
+
+import logging
+from operator import attrgetter
+
+from asgiref.sync import async_to_sync
+from celery import shared_task
+from channels.layers import get_channel_layer
+from django.utils import timezone
+
+from stations.models import Station
+from .management.commands.aprs_listener import APRSParser, packet_parsed_data, prerendered
+from .models import APRSPacket
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH_SIZE = 500
+
+# Most packets or stations carried by one WebSocket broadcast
+BROADCAST_BATCH_SIZE = 200
+
+# Fields sent for each packet and station in batch broadcasts, read in one
+# attrgetter call per row; orjson formats the datetimes as isoformat() does
+PACKET_BROADCAST_FIELDS = ('id', 'source_callsign', 'packet_type', 'timestamp', 'raw_packet', 'parsed_data')
+STATION_BROADCAST_FIELDS = (
+    'id', 'callsign', 'latitude', 'longitude', 'symbol_table', 'symbol_code',
+    'last_heard', 'last_comment', 'station_type', 'emoji_symbol'
+)
+_packet_values = attrgetter(*PACKET_BROADCAST_FIELDS)
+_station_values = attrgetter(*STATION_BROADCAST_FIELDS)
+
+# Station columns refreshed from each position report
+STATION_POSITION_FIELDS = [
+    'latitude', 'longitude', 'symbol_table', 'symbol_code',
+    'last_heard', 'last_comment', 'station_type', 'is_active',
+]
+
+
+@shared_task(ignore_result=True)
+def persist_aprs_packets(raw_packets):
+    """Parse and save a batch of raw APRS-IS lines, then broadcast them to WebSocket clients"""
+    packets = []
+    positions = {}
+    for raw_packet in raw_packets:
+        parsed = APRSParser.parse_packet(raw_packet)
+
+        if 'error' in parsed:
+            logger.warning(f"Failed to parse packet: {parsed['error']}")
+            continue
+
+        packet = APRSPacket(
+            source_callsign=parsed['source_callsign'],
+            packet_type=parsed['packet_type'],
+            timestamp=timezone.now(),
+            raw_packet=raw_packet,
+            parsed_data=packet_parsed_data(parsed)
+        )
+        # bulk_create skips save(), which is where packets get marked processed
+        packet.process_packet()
+        packets.append(packet)
+
+        # Keep only the latest position per station
+        if parsed['packet_type'] == 'position' and 'latitude' in parsed and 'longitude' in parsed:
+            positions[parsed['source_callsign']] = {
+                'latitude': parsed['latitude'],
+                'longitude': parsed['longitude'],
+                'symbol_table': parsed.get('symbol_table', '/'),
+                'symbol_code': parsed.get('symbol_code', '/'),
+                'last_heard': packet.timestamp,
+                'last_comment': parsed.get('comment', ''),
+                'station_type': 'mobile' if parsed.get('symbol_code') == '>' else 'fixed',
+                'is_active': True
+            }
+
+    if not packets:
+        return
+
+    APRSPacket.objects.bulk_create(packets, batch_size=INSERT_BATCH_SIZE)
+    stations = _update_station_positions(positions)
+
+    # Broadcast packets and station updates via WebSocket, a chunk per message
+    channel_layer = get_channel_layer()
+    if channel_layer:
+        group_send = async_to_sync(channel_layer.group_send)
+        # One timestamp per flush, reused verbatim by every consumer
+        sent_at = timezone.now()
+        for start in range(0, len(packets), BROADCAST_BATCH_SIZE):
+            group_send('aprs_packets', prerendered({
+                'type': 'packet_batch_update',
+                'packets': [_serialize_packet(packet) for packet in packets[start:start + BROADCAST_BATCH_SIZE]],
+                'timestamp': sent_at,
+            }))
+        for start in range(0, len(stations), BROADCAST_BATCH_SIZE):
+            group_send('stations', prerendered({
+                'type': 'station_batch_update',
+                'stations': [_serialize_station(station) for station in stations[start:start + BROADCAST_BATCH_SIZE]],
+                'timestamp': sent_at,
+            }))
+
+    logger.debug(f"Processed {len(packets)} packets, {len(stations)} station positions")
+
+
+def _update_station_positions(positions):
+    """Upsert stations from a callsign -> position fields mapping"""
+    if not positions:
+        return []
+
+    # INSERT ... ON CONFLICT (callsign) DO UPDATE, one statement per batch
+    stations = [Station(callsign=callsign, **values) for callsign, values in positions.items()]
+    Station.objects.bulk_create(
+        stations,
+        batch_size=INSERT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['callsign'],
+        update_fields=STATION_POSITION_FIELDS,
+    )
+
+    # Upserted rows do not get their primary keys back on Django 4.2
+    ids = dict(Station.objects.filter(callsign__in=list(positions)).values_list('callsign', 'id'))
+    for station in stations:
+        station.id = ids.get(station.callsign)
+    return stations
+
+
+def _serialize_packet(packet):
+    return dict(zip(PACKET_BROADCAST_FIELDS, _packet_values(packet)))
+
+
+def _serialize_station(station):
+    return dict(zip(STATION_BROADCAST_FIELDS, _station_values(station)))
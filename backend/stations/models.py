@@ -11,6 +11,50 @@ from django.core.validators import RegexValidator
 import json
 
 
+# Emoji shown for APRS symbol (table, code) pairs
+SYMBOL_EMOJI = {
+    ('/', '!'): '🚔',  # Police car
+    ('/', '#'): '🏠',  # House
+    ('/', '$'): '📱',  # Phone
+    ('/', '%'): '🔌',  # Power
+    ('/', '&'): '📡',  # Radio Gateway
+    ('/', '('): '📱',  # Mobile phone
+    ('/', '*'): '❄️',  # Snow
+    ('/', '+'): '🏥',  # Red Cross
+    ('/', '-'): '🏠',  # House QTH
+    ('/', '.'): '🔴',  # Red Dot
+    ('/', '/'): '🔴',  # Red Dot
+    ('/', '>'): '🚗',  # Car
+    ('/', 'A'): '🚑',  # Ambulance
+    ('/', 'B'): '🚲',  # Bicycle
+    ('/', 'C'): '🏭',  # Canoe
+    ('/', 'D'): '🔥',  # Fire dept
+    ('/', 'E'): '👁️',  # Eye
+    ('/', 'F'): '🚒',  # Fire truck
+    ('/', 'G'): '🎯',  # Grid
+    ('/', 'H'): '🏨',  # Hotel
+    ('/', 'I'): '🏝️',  # Island
+    ('/', 'J'): '✈️',  # Jet
+    ('/', 'K'): '🏫',  # School
+    ('/', 'L'): '💡',  # Lighthouse
+    ('/', 'M'): '🏔️',  # Mountain
+    ('/', 'N'): '🚁',  # Helicopter
+    ('/', 'O'): '🎈',  # Balloon
+    ('/', 'P'): '👮',  # Police
+    ('/', 'Q'): '🔲',  # Square
+    ('/', 'R'): '🚗',  # RV
+    ('/', 'S'): '🛰️',  # Satellite
+    ('/', 'T'): '📱',  # Phone
+    ('/', 'U'): '🚌',  # Bus
+    ('/', 'V'): '🚐',  # Van
+    ('/', 'W'): '💧',  # Water
+    ('/', 'X'): '❌',  # X
+    ('/', 'Y'): '⛵',  # Yacht
+    ('/', 'Z'): '⚡',  # Lightning
+    ('/', '_'): '🌡️',  # Weather station
+}
+
+
 class Station(models.Model):
     """Model for APRS stations"""
     
@@ -94,50 +138,12 @@ class Station(models.Model):
     @property
     def emoji_symbol(self):
         """Return emoji representation of station symbol"""
-        symbol_map = {
-            ('/', '!'): '🚔',  # Police car
-            ('/', '#'): '🏠',  # House
-            ('/', '$'): '📱',  # Phone
-            ('/', '%'): '🔌',  # Power
-            ('/', '&'): '📡',  # Radio Gateway
-            ('/', '('): '📱',  # Mobile phone
-            ('/', '*'): '❄️',  # Snow
-            ('/', '+'): '🏥',  # Red Cross
-            ('/', '-'): '🏠',  # House QTH
-            ('/', '.'): '🔴',  # Red Dot
-            ('/', '/'): '🔴',  # Red Dot
-            ('/', '>'): '🚗',  # Car
-            ('/', 'A'): '🚑',  # Ambulance
-            ('/', 'B'): '🚲',  # Bicycle
-            ('/', 'C'): '🏭',  # Canoe
-            ('/', 'D'): '🔥',  # Fire dept
-            ('/', 'E'): '👁️',  # Eye
-            ('/', 'F'): '🚒',  # Fire truck
-            ('/', 'G'): '🎯',  # Grid
-            ('/', 'H'): '🏨',  # Hotel
-            ('/', 'I'): '🏝️',  # Island
-            ('/', 'J'): '✈️',  # Jet
-            ('/', 'K'): '🏫',  # School
-            ('/', 'L'): '💡',  # Lighthouse
-            ('/', 'M'): '🏔️',  # Mountain
-            ('/', 'N'): '🚁',  # Helicopter
-            ('/', 'O'): '🎈',  # Balloon
-            ('/', 'P'): '👮',  # Police
-            ('/', 'Q'): '🔲',  # Square
-            ('/', 'R'): '🚗',  # RV
-            ('/', 'S'): '🛰️',  # Satellite
-            ('/', 'T'): '📱',  # Phone
-            ('/', 'U'): '🚌',  # Bus
-            ('/', 'V'): '🚐',  # Van
-            ('/', 'W'): '💧',  # Water
-            ('/', 'X'): '❌',  # X
-            ('/', 'Y'): '⛵',  # Yacht
-            ('/', 'Z'): '⚡',  # Lightning
-            ('/', '_'): '🌡️',  # Weather station
-        }
-        
-        key = (self.symbol_table, self.symbol_code)
-        return symbol_map.get(key, '📍')  # Default to pin emoji
+        return self.symbol_emoji(self.symbol_table, self.symbol_code)
+    
+    @staticmethod
+    def symbol_emoji(symbol_table, symbol_code):
+        """Emoji for an APRS symbol table/code pair"""
+        return SYMBOL_EMOJI.get((symbol_table, symbol_code), '📍')  # Default to pin emoji
     
     def update_position(self, position, altitude=None, comment=''):
         """Update station position and related information"""
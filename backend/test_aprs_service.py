@@ -4,9 +4,8 @@ Test APRS-IS connection functionality
 """
 import os
 import sys
+import asyncio
 import django
-import threading
-import time
 from django.conf import settings
 
 # Add the backend directory to the Python path
@@ -18,7 +17,7 @@ django.setup()
 
 from websockets.aprs_service import APRSISConnectionService
 
-def test_aprs_connection():
+async def _run_aprs_connection():
     """Test APRS-IS connection service"""
     print("🔍 Testing APRS-IS connection functionality...")
     
@@ -44,29 +43,34 @@ def test_aprs_connection():
     try:
         # Start connection in background
         print("   Starting APRS-IS connection...")
-        service.connect(test_settings)
+        await service.connect(test_settings)
         
         # Wait a moment for connection to establish
-        time.sleep(3)
+        await asyncio.sleep(3)
         
         if service.is_connected:
             print("✅ APRS-IS connection established!")
             
             # Let it run for a few seconds to receive some data
             print("   Waiting for data...")
-            time.sleep(10)
+            await asyncio.sleep(10)
             
             # Disconnect
             print("   Disconnecting...")
-            service.disconnect()
+            await service.disconnect()
             print("✅ APRS-IS disconnected successfully")
         else:
             print("❌ Failed to establish APRS-IS connection")
+            await service.disconnect()
             
     except Exception as e:
         print(f"❌ Error testing APRS-IS connection: {e}")
         
     print("\n🎉 APRS-IS connection test completed!")
 
+def test_aprs_connection():
+    """Run the APRS-IS connection check from a synchronous test runner"""
+    asyncio.run(_run_aprs_connection())
+
 if __name__ == "__main__":
-    test_aprs_connection()
+    asyncio.run(_run_aprs_connection())
@@ -10,8 +10,23 @@ This script tests the complete weather radar integration including:
 
 import requests
 import json
+import re
 import time
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+
+# One keep-alive session so repeated probes reuse pooled connections
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# DRF renders compact JSON with "success" first, so the head of the body is enough
+SUCCESS_PATTERN = re.compile(rb'^\{"success":\s*true')
+
+
+def read_head(response, size=4096):
+    """First chunk of a streamed response body"""
+    return next(response.iter_content(size), b'')
 
 
 def test_complete_radar_integration():
@@ -27,11 +42,11 @@ def test_complete_radar_integration():
     
     # Test radar sites
     try:
-        response = requests.get("http://localhost:8000/api/weather/radar-sites/", params={
+        response = SESSION.get("http://localhost:8000/api/weather/radar-sites/", params={
             'lat': 39.7392,
             'lon': -104.9847,
             'max_distance': 300
-        })
+        }, timeout=5)
         
         if response.status_code == 200:
             data = response.json()
@@ -46,22 +61,24 @@ def test_complete_radar_integration():
                 
                 # Test radar data
                 print(f"   Testing radar data for {site_id}...")
-                response = requests.get(f"http://localhost:8000/api/weather/radar-data/{site_id}/")
+                # Stream it: the data grid is large and only the success flag matters
+                with SESSION.get(f"http://localhost:8000/api/weather/radar-data/{site_id}/",
+                                 stream=True, timeout=5) as response:
+                    head = read_head(response) if response.status_code == 200 else b''
                 if response.status_code == 200:
-                    data = response.json()
-                    if data.get('success'):
+                    if SUCCESS_PATTERN.match(head):
                         print(f"   ✅ Radar data available")
                         
                         # Test radar overlay
                         print(f"   Testing radar overlay for {site_id}...")
-                        response = requests.get(f"http://localhost:8000/api/weather/radar-overlay/{site_id}/", params={
+                        response = SESSION.get(f"http://localhost:8000/api/weather/radar-overlay/{site_id}/", params={
                             'south': 38.5,
                             'west': -106.0,
                             'north': 41.0,
                             'east': -103.0,
                             'width': 256,
                             'height': 256
-                        })
+                        }, timeout=5)
                         
                         if response.status_code == 200:
                             data = response.json()
@@ -69,12 +86,17 @@ def test_complete_radar_integration():
                                 print(f"   ✅ Radar overlay generated")
                                 print(f"   📊 Image size: {data.get('size', 'Unknown')}")
                                 print(f"   📊 Format: {data.get('format', 'Unknown')}")
+                                print(f"   📊 Payload: {response.headers.get('Content-Length', 'Unknown')} bytes")
                             else:
                                 print(f"   ❌ Radar overlay failed: {data.get('message', 'Unknown')}")
                         else:
                             print(f"   ❌ Radar overlay endpoint failed: HTTP {response.status_code}")
                     else:
-                        print(f"   ❌ Radar data failed: {data.get('message', 'Unknown')}")
+                        try:
+                            message = json.loads(head).get('message', 'Unknown')
+                        except ValueError:
+                            message = 'Unknown'
+                        print(f"   ❌ Radar data failed: {message}")
                 else:
                     print(f"   ❌ Radar data endpoint failed: HTTP {response.status_code}")
         else:
@@ -88,7 +110,7 @@ def test_complete_radar_integration():
     print("-" * 35)
     
     try:
-        response = requests.get("http://localhost:3000")
+        response = SESSION.get("http://localhost:3000", timeout=5)
         if response.status_code == 200:
             print("✅ Frontend accessible")
             
@@ -125,7 +147,7 @@ def test_complete_radar_integration():
     
     try:
         # Test stations API (should be working)
-        response = requests.get("http://localhost:8000/api/stations/")
+        response = SESSION.get("http://localhost:8000/api/stations/", timeout=5)
         if response.status_code == 200:
             data = response.json()
             stations = data.get('results', [])
@@ -134,7 +156,7 @@ def test_complete_radar_integration():
             print(f"⚠️ Stations API: HTTP {response.status_code}")
             
         # Test weather API
-        response = requests.get("http://localhost:8000/api/weather/stats/")
+        response = SESSION.get("http://localhost:8000/api/weather/stats/", timeout=5)
         if response.status_code == 200:
             data = response.json()
             print(f"✅ Weather API: {data.get('radar_data_count', 0)} radar records")
@@ -152,11 +174,11 @@ def test_complete_radar_integration():
         # Test multiple requests to check caching
         start_time = time.time()
         for i in range(3):
-            response = requests.get("http://localhost:8000/api/weather/radar-sites/", params={
+            response = SESSION.get("http://localhost:8000/api/weather/radar-sites/", params={
                 'lat': 39.7392,
                 'lon': -104.9847,
                 'max_distance': 300
-            })
+            }, timeout=5)
         end_time = time.time()
         
         avg_time = (end_time - start_time) / 3
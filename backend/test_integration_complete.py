@@ -9,81 +9,152 @@ Integration test to verify the complete settings flow:
 import os
 import sys
 import django
-import json
+import orjson
 import time
-from datetime import datetime
+from operator import itemgetter
 
 # Add the project root to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# Set up Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aprs_server.settings')
-django.setup()
-
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
 from django.test import Client
-from websockets.models import UserSettings
+from django.test.utils import CaptureQueriesContext
+
+
+def _ensure_django():
+    """Set up Django on first use instead of at import time."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aprs_server.settings')
+    if not apps.ready:
+        django.setup()
+
+
+def _truncate_settings():
+    """Empty the user settings table and its cached responses without loading any rows."""
+    from django.core.cache import cache
+    from websockets.models import UserSettings
+    from websockets.settings_api import _settings_cache_key
+    table = connection.ops.quote_name(UserSettings._meta.db_table)
+    with connection.cursor() as cursor:
+        # Raw deletes skip the API, so drop the cached GET responses too
+        cursor.execute(f'SELECT session_key FROM {table}')
+        cache.delete_many([_settings_cache_key(row[0]) for row in cursor.fetchall()])
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'TRUNCATE TABLE {table} RESTART IDENTITY CASCADE')
+        else:
+            cursor.execute(f'DELETE FROM {table}')
+
+
+# Shared test client; the Django test client never enforces CSRF checks
+CLIENT = Client(enforce_csrf_checks=False, SERVER_NAME='localhost')
+
+# SQL budgets for the settings endpoint once the session and settings row
+# exist; sessions are read from the cache, so none include a session lookup
+GET_QUERY_BUDGET = 1         # settings SELECT, after a save invalidated the cached response
+CACHED_GET_QUERY_BUDGET = 0  # repeat GET served from the cached response
+POST_QUERY_BUDGET = 1        # targeted UPDATE, no SELECT
+
+# Critical settings checks as (getter, expected, name), built once at import
+CHECKS = tuple((itemgetter(key), expected, key) for key, expected in [
+    ('callsign', 'W1AW'),
+    ('ssid', 1),
+    ('distanceUnit', 'km'),
+    ('aprsIsConnected', False),  # CRITICAL: Must be False
+    ('darkTheme', False),
+])
+
+# Settings payloads are constant, so they are serialized once at import
+TEST_SETTINGS = {
+    'callsign': 'W1AW',
+    'ssid': 1,
+    'passcode': 24848,
+    'location': {
+        'latitude': 41.7148,
+        'longitude': -72.7279,
+        'source': 'manual'
+    },
+    'autoGeneratePasscode': True,
+    'distanceUnit': 'km',
+    'darkTheme': False,
+    'aprsIsConnected': False,  # This should NEVER be True on app start
+    'aprsIsFilters': {
+        'distanceRange': 50,
+        'stationTypes': ['mobile', 'fixed', 'weather'],
+        'enableWeather': True,
+        'enableMessages': True
+    },
+    'tncSettings': {
+        'enabled': False,
+        'connectionType': 'serial',
+        'port': 'COM1',
+        'baudRate': 9600,
+        'audioInput': 'default',
+        'audioOutput': 'default',
+        'audioInputGain': 50,
+        'audioOutputGain': 50,
+        'pttMethod': 'vox',
+        'pttPin': 'RTS',
+        'radioControl': {
+            'enabled': False,
+            'type': 'none'
+        },
+        'kissMode': True,
+        'txDelay': 30,
+        'persistence': 63,
+        'slotTime': 10,
+        'txTail': 5,
+        'fullDuplex': False,
+        'maxFrameLength': 256,
+        'retries': 3,
+        'respTime': 3000
+    }
+}
+TEST_SETTINGS_BYTES = orjson.dumps({'settings': TEST_SETTINGS})
+
+AUTOCONNECT_SETTINGS = {
+    'callsign': 'TEST',
+    'ssid': 0,
+    'passcode': 12345,
+    'aprsIsConnected': True,  # User had it connected before
+    'distanceUnit': 'km',
+    'darkTheme': False
+}
+AUTOCONNECT_SETTINGS_BYTES = orjson.dumps({'settings': AUTOCONNECT_SETTINGS})
+
+
+def within_query_budget(ctx, budget, label):
+    """Log the queries a request issued and whether they fit its budget."""
+    count = len(ctx.captured_queries)
+    if count <= budget:
+        print(f"   ✅ {label}: {count} queries (budget: {budget})")
+        return True
+    print(f"   ❌ {label}: {count} queries (budget: {budget})")
+    for query in ctx.captured_queries:
+        print(f"      {query['sql']}")
+    return False
+
+
+def elapsed_ms(start_ns):
+    """Milliseconds since a time.perf_counter_ns() reading."""
+    return (time.perf_counter_ns() - start_ns) / 1e6
+
 
 def test_complete_settings_flow():
     """Test the complete settings flow."""
+    _ensure_django()
     print("=" * 60)
     print("🔧 APRSwx Settings Integration Test")
     print("=" * 60)
     
     # Clear any existing settings
-    UserSettings.objects.all().delete()
+    _truncate_settings()
     print("1. ✅ Cleared existing settings")
     
-    # Create test settings
-    test_settings = {
-        'callsign': 'W1AW',
-        'ssid': 1,
-        'passcode': 24848,
-        'location': {
-            'latitude': 41.7148,
-            'longitude': -72.7279,
-            'source': 'manual'
-        },
-        'autoGeneratePasscode': True,
-        'distanceUnit': 'km',
-        'darkTheme': False,
-        'aprsIsConnected': False,  # This should NEVER be True on app start
-        'aprsIsFilters': {
-            'distanceRange': 50,
-            'stationTypes': ['mobile', 'fixed', 'weather'],
-            'enableWeather': True,
-            'enableMessages': True
-        },
-        'tncSettings': {
-            'enabled': False,
-            'connectionType': 'serial',
-            'port': 'COM1',
-            'baudRate': 9600,
-            'audioInput': 'default',
-            'audioOutput': 'default',
-            'audioInputGain': 50,
-            'audioOutputGain': 50,
-            'pttMethod': 'vox',
-            'pttPin': 'RTS',
-            'radioControl': {
-                'enabled': False,
-                'type': 'none'
-            },
-            'kissMode': True,
-            'txDelay': 30,
-            'persistence': 63,
-            'slotTime': 10,
-            'txTail': 5,
-            'fullDuplex': False,
-            'maxFrameLength': 256,
-            'retries': 3,
-            'respTime': 3000
-        }
-    }
-    
     # Save settings through API
-    client = Client()
+    client = CLIENT
     response = client.post('/api/websockets/settings/', 
-                          data=json.dumps({'settings': test_settings}),
+                          data=TEST_SETTINGS_BYTES,
                           content_type='application/json')
     
     if response.status_code == 200:
@@ -93,7 +164,8 @@ def test_complete_settings_flow():
         return False
     
     # Load settings through API
-    response = client.get('/api/websockets/settings/')
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get('/api/websockets/settings/')
     
     if response.status_code == 200:
         data = response.json()
@@ -102,17 +174,12 @@ def test_complete_settings_flow():
             print("3. ✅ Settings loaded from database via API")
             
             # Check critical settings
-            checks = [
-                ('callsign', 'W1AW'),
-                ('ssid', 1),
-                ('distanceUnit', 'km'),
-                ('aprsIsConnected', False),  # CRITICAL: Must be False
-                ('darkTheme', False),
-            ]
-            
-            all_passed = True
-            for key, expected in checks:
-                actual = loaded_settings.get(key)
+            all_passed = within_query_budget(ctx, GET_QUERY_BUDGET, 'GET settings')
+            for getter, expected, key in CHECKS:
+                try:
+                    actual = getter(loaded_settings)
+                except KeyError:
+                    actual = None
                 if actual == expected:
                     print(f"   ✅ {key}: {actual} (expected: {expected})")
                 else:
@@ -127,6 +194,15 @@ def test_complete_settings_flow():
                 print(f"   ❌ tncSettings.enabled: {tnc_enabled} (expected: False)")
                 all_passed = False
             
+            # A repeat load is served from the cached response
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get('/api/websockets/settings/')
+            if response.status_code != 200 or response.json() != data:
+                print("   ❌ Cached GET returned different settings")
+                all_passed = False
+            if not within_query_budget(ctx, CACHED_GET_QUERY_BUDGET, 'Cached GET settings'):
+                all_passed = False
+            
             return all_passed
         else:
             print("3. ❌ No settings returned from API")
@@ -137,33 +213,31 @@ def test_complete_settings_flow():
 
 def test_aprs_is_autoconnect_prevention():
     """Test that APRS-IS doesn't auto-connect."""
+    _ensure_django()
     print("\n" + "=" * 60)
     print("🔌 APRS-IS Auto-Connect Prevention Test")
     print("=" * 60)
     
     # Save settings with aprsIsConnected = True (simulating user had it connected)
-    client = Client()
-    test_settings = {
-        'callsign': 'TEST',
-        'ssid': 0,
-        'passcode': 12345,
-        'aprsIsConnected': True,  # User had it connected before
-        'distanceUnit': 'km',
-        'darkTheme': False
-    }
-    
-    response = client.post('/api/websockets/settings/', 
-                          data=json.dumps({'settings': test_settings}),
-                          content_type='application/json')
+    client = CLIENT
+    # A brand-new session costs extra writes, so only budget an existing one
+    has_session = settings.SESSION_COOKIE_NAME in client.cookies
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.post('/api/websockets/settings/', 
+                              data=AUTOCONNECT_SETTINGS_BYTES,
+                              content_type='application/json')
     
     if response.status_code == 200:
         print("1. ✅ Settings saved with aprsIsConnected=True")
     else:
         print(f"1. ❌ Failed to save settings: {response.status_code}")
         return False
+    if has_session and not within_query_budget(ctx, POST_QUERY_BUDGET, 'POST settings'):
+        return False
     
     # Load settings (simulating app startup)
-    response = client.get('/api/websockets/settings/')
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get('/api/websockets/settings/')
     
     if response.status_code == 200:
         data = response.json()
@@ -172,6 +246,8 @@ def test_aprs_is_autoconnect_prevention():
             aprs_connected = loaded_settings.get('aprsIsConnected')
             
             print("2. ✅ Settings loaded on app startup")
+            if not within_query_budget(ctx, GET_QUERY_BUDGET, 'GET settings'):
+                return False
             print(f"   Raw aprsIsConnected value: {aprs_connected}")
             
             # The frontend should ALWAYS override this to False on app start
@@ -192,6 +268,8 @@ def test_aprs_is_autoconnect_prevention():
 
 def check_database_state():
     """Check the current database state."""
+    _ensure_django()
+    from websockets.models import UserSettings
     print("\n" + "=" * 60)
     print("🗄️  Database State Check")
     print("=" * 60)
@@ -210,13 +288,8 @@ def check_database_state():
             print(f"Latest dark theme: {latest_setting.dark_theme}")
             
             # Check TNC settings
-            tnc_settings = latest_setting.tnc_settings
-            if tnc_settings:
-                try:
-                    tnc_data = json.loads(tnc_settings)
-                    print(f"TNC enabled: {tnc_data.get('enabled', 'None')}")
-                except json.JSONDecodeError:
-                    print("TNC settings: Invalid JSON")
+            if latest_setting.tnc_settings:
+                print(f"TNC enabled: {latest_setting.tnc_get('enabled', 'None')}")
             else:
                 print("TNC settings: None")
             
@@ -226,17 +299,25 @@ def check_database_state():
         return False
 
 if __name__ == "__main__":
-    print(f"🚀 Starting integration test at {datetime.now()}")
+    _ensure_django()
+    print("🚀 Starting integration test")
+    t0 = time.perf_counter_ns()
     
     try:
         # Test 1: Complete settings flow
+        phase_start = time.perf_counter_ns()
         test1_passed = test_complete_settings_flow()
+        print(f"⏱️  Test 1 took {elapsed_ms(phase_start):.1f} ms")
         
         # Test 2: APRS-IS auto-connect prevention
+        phase_start = time.perf_counter_ns()
         test2_passed = test_aprs_is_autoconnect_prevention()
+        print(f"⏱️  Test 2 took {elapsed_ms(phase_start):.1f} ms")
         
         # Test 3: Database state check
+        phase_start = time.perf_counter_ns()
         test3_passed = check_database_state()
+        print(f"⏱️  Test 3 took {elapsed_ms(phase_start):.1f} ms")
         
         print("\n" + "=" * 60)
         print("📊 FINAL RESULTS")
@@ -254,6 +335,7 @@ if __name__ == "__main__":
             print(f"{test_name}: {status}")
             if not passed:
                 all_passed = False
+        print(f"⏱️  Total: {elapsed_ms(t0):.1f} ms")
         
         if all_passed:
             print("\n🎉 All integration tests PASSED!")
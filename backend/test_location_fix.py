@@ -4,35 +4,48 @@ Test script to verify the latitude/longitude toFixed() fix
 """
 import os
 import django
-import requests
+import httpx
 import json
 
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aprs_server.settings')
-django.setup()
+from django.apps import apps
+
+
+def _ensure_django():
+    """Set up Django on first use instead of at import time."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aprs_server.settings')
+    if not apps.ready:
+        django.setup()
+
+
+# Pooled HTTP/2-capable client reused for every API call in this script
+CLIENT = httpx.Client(http2=True, timeout=30, headers={'X-Session-Key': 'location_test'})
 
-from websockets.models import UserSettings
 
 def test_location_fix():
     """Test that location data is returned as numbers, not strings"""
+    _ensure_django()
+    from websockets.models import UserSettings
     print("🔍 Testing Location Data Type Fix")
     print("=" * 50)
     
-    # Create a test location entry
-    test_settings = UserSettings.objects.create(
-        session_key='location_test',
-        callsign='TEST',
-        ssid=1,
-        passcode=12345,
-        latitude=40.7128,
-        longitude=-74.0060,
-        location_source='manual'
-    )
+    # Drop leftovers from an interrupted run, then create the fixture so a
+    # conflicting row raises instead of being silently kept
+    UserSettings.objects.filter(session_key='location_test').delete()
+    UserSettings.objects.bulk_create([
+        UserSettings(
+            session_key='location_test',
+            callsign='TEST',
+            ssid=1,
+            passcode=12345,
+            latitude=40.7128,
+            longitude=-74.0060,
+            location_source='manual'
+        ),
+    ])
     
     try:
         # Test the API response
-        response = requests.get('http://localhost:8000/api/websockets/settings/', 
-                               headers={'X-Session-Key': 'location_test'})
+        response = CLIENT.get('http://localhost:8000/api/websockets/settings/')
         
         if response.status_code == 200:
             data = response.json()
@@ -86,7 +99,11 @@ def test_location_fix():
     return True
 
 if __name__ == "__main__":
-    success = test_location_fix()
+    _ensure_django()
+    try:
+        success = test_location_fix()
+    finally:
+        CLIENT.close()
     
     if success:
         print("\n" + "=" * 50)
@@ -4,26 +4,74 @@ Weather Radar Integration Test
 This script tests the weather radar integration with the frontend and backend.
 """
 
-import requests
-import json
-import time
-from datetime import datetime
+import asyncio
+import httpx
+import re
 
 
-def test_radar_integration():
-    """Test the weather radar integration"""
-    print("🌧️ Weather Radar Integration Test")
-    print("=" * 40)
-    print(f"Test time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print()
-    
-    # Test backend radar endpoints
-    print("Testing backend radar endpoints...")
-    
-    # Test radar sites endpoint
+BACKEND_URL = "http://localhost:8000"
+FRONTEND_URL = "http://localhost:3000"
+
+RADAR_FEATURES = [
+    ("radar", "Radar functionality"),
+    ("opacity", "Opacity control"),
+    ("reflectivity", "Reflectivity product"),
+    ("velocity", "Velocity product"),
+    ("overlay", "Radar overlay")
+]
+# One case-insensitive alternation with a named group per keyword, so a single
+# pass over the raw page bytes finds them all without decoding or lowercasing
+RADAR_FEATURE_PATTERN = re.compile(
+    b'|'.join(
+        b'(?P<' + feature.encode() + b'>' + re.escape(feature.encode()) + b')'
+        for feature, _ in RADAR_FEATURES
+    ),
+    re.IGNORECASE
+)
+
+
+async def probe_radar_batch(client, site_ids):
+    """Test radar data and overlays for several sites in one batch request"""
+    lines = ["\n2. Testing radar batch endpoint..."]
+    try:
+        response = await client.post("/api/weather/radar-batch/", json={
+            'site_ids': site_ids,
+            'bounds': [38.5, -106.0, 41.0, -103.0],
+            'size': [256, 256]
+        })
+        
+        if response.status_code == 200:
+            data = response.json()
+            for site_id, result in data.get('results', {}).items():
+                if not result.get('success'):
+                    lines.append(f"⚠️ Radar data not available for {site_id}: {result.get('message', 'Unknown error')}")
+                    continue
+                
+                lines.append(f"✅ Radar data working for {site_id}")
+                radar_data = result.get('data', {})
+                lines.append(f"   Timestamp: {radar_data.get('timestamp', 'Unknown')}")
+                lines.append(f"   Product: {radar_data.get('product', 'Unknown')}")
+                
+                overlay = result.get('overlay')
+                if overlay:
+                    lines.append(f"✅ Radar overlay working for {site_id}")
+                    lines.append(f"   Format: {overlay.get('format', 'Unknown')}")
+                    lines.append(f"   Source: {overlay.get('source', overlay.get('encoding', 'Unknown'))}")
+                    lines.append(f"   Image URL: {overlay.get('overlay_url', 'Unknown')}")
+                else:
+                    lines.append(f"⚠️ Radar overlay not available for {site_id}")
+        else:
+            lines.append(f"❌ Radar batch endpoint failed: HTTP {response.status_code}")
+    except Exception as e:
+        lines.append(f"❌ Radar batch test failed: {e}")
+    return lines
+
+
+async def probe_backend(client):
+    """Test the backend radar endpoints"""
+    lines = ["Testing backend radar endpoints...", "1. Testing radar sites endpoint..."]
     try:
-        print("1. Testing radar sites endpoint...")
-        response = requests.get("http://localhost:8000/api/weather/radar-sites/", params={
+        response = await client.get("/api/weather/radar-sites/", params={
             'lat': 39.7392,
             'lon': -104.9847,
             'max_distance': 300
@@ -32,104 +80,78 @@ def test_radar_integration():
         if response.status_code == 200:
             data = response.json()
             sites = data.get('radar_sites', [])
-            print(f"✅ Radar sites endpoint working: {len(sites)} sites found")
+            lines.append(f"✅ Radar sites endpoint working: {len(sites)} sites found")
             
             if sites:
                 nearest_site = sites[0]
-                print(f"   Nearest site: {nearest_site.get('site_name', 'Unknown')} ({nearest_site.get('site_id', 'Unknown')})")
-                print(f"   Distance: {nearest_site.get('distance_km', 0):.1f} km")
+                lines.append(f"   Nearest site: {nearest_site.get('site_name', 'Unknown')} ({nearest_site.get('site_id', 'Unknown')})")
+                lines.append(f"   Distance: {nearest_site.get('distance_km', 0):.1f} km")
                 
-                # Test radar data endpoint
-                print("\n2. Testing radar data endpoint...")
-                site_id = nearest_site.get('site_id')
-                if site_id:
-                    try:
-                        response = requests.get(f"http://localhost:8000/api/weather/radar-data/{site_id}/", params={
-                            'product': 'reflectivity'
-                        })
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            if data.get('success'):
-                                print(f"✅ Radar data endpoint working for {site_id}")
-                                radar_data = data.get('data', {})
-                                print(f"   Timestamp: {radar_data.get('timestamp', 'Unknown')}")
-                                print(f"   Product: {radar_data.get('product', 'Unknown')}")
-                            else:
-                                print(f"⚠️ Radar data not available: {data.get('message', 'Unknown error')}")
-                        else:
-                            print(f"❌ Radar data endpoint failed: HTTP {response.status_code}")
-                    except Exception as e:
-                        print(f"❌ Radar data test failed: {e}")
-                        
-                # Test radar overlay endpoint
-                print("\n3. Testing radar overlay endpoint...")
-                if site_id:
-                    try:
-                        response = requests.get(f"http://localhost:8000/api/weather/radar-overlay/{site_id}/", params={
-                            'south': 38.5,
-                            'west': -106.0,
-                            'north': 41.0,
-                            'east': -103.0,
-                            'width': 256,
-                            'height': 256
-                        })
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            if data.get('success'):
-                                print(f"✅ Radar overlay endpoint working for {site_id}")
-                                print(f"   Format: {data.get('format', 'Unknown')}")
-                                print(f"   Encoding: {data.get('encoding', 'Unknown')}")
-                                print(f"   Image size: {data.get('size', 'Unknown')}")
-                                image_data = data.get('image_data', '')
-                                print(f"   Image data length: {len(image_data)} characters")
-                            else:
-                                print(f"⚠️ Radar overlay not available: {data.get('message', 'Unknown error')}")
-                        else:
-                            print(f"❌ Radar overlay endpoint failed: HTTP {response.status_code}")
-                    except Exception as e:
-                        print(f"❌ Radar overlay test failed: {e}")
+                # Fetch data and overlays for every site in a single request
+                site_ids = [site['site_id'] for site in sites if site.get('site_id')]
+                if site_ids:
+                    lines.extend(await probe_radar_batch(client, site_ids))
             else:
-                print("⚠️ No radar sites found near Denver")
+                lines.append("⚠️ No radar sites found near Denver")
         else:
-            print(f"❌ Radar sites endpoint failed: HTTP {response.status_code}")
+            lines.append(f"❌ Radar sites endpoint failed: HTTP {response.status_code}")
             
     except Exception as e:
-        print(f"❌ Backend radar test failed: {e}")
-    
-    # Test frontend radar integration
-    print("\n" + "=" * 40)
-    print("Testing frontend radar integration...")
-    
+        lines.append(f"❌ Backend radar test failed: {e}")
+    return lines
+
+
+async def probe_frontend(client):
+    """Test that the frontend exposes the radar controls"""
+    lines = ["\n" + "=" * 40, "Testing frontend radar integration..."]
     try:
         # Test if frontend is accessible
-        response = requests.get("http://localhost:3000")
+        response = await client.get(FRONTEND_URL)
         if response.status_code == 200:
-            print("✅ Frontend is accessible")
-            
-            # Check if radar controls are present
-            content = response.text.lower()
+            lines.append("✅ Frontend is accessible")
             
-            radar_features = [
-                ("radar", "Radar functionality"),
-                ("opacity", "Opacity control"),
-                ("reflectivity", "Reflectivity product"),
-                ("velocity", "Velocity product"),
-                ("overlay", "Radar overlay")
-            ]
+            # Check if radar controls are present, scanning the page once
+            found = {match.lastgroup for match in RADAR_FEATURE_PATTERN.finditer(response.content)}
             
-            for feature, description in radar_features:
-                if feature in content:
-                    print(f"✅ {description} detected in frontend")
+            for feature, description in RADAR_FEATURES:
+                if feature in found:
+                    lines.append(f"✅ {description} detected in frontend")
                 else:
-                    print(f"⚠️ {description} may not be implemented")
+                    lines.append(f"⚠️ {description} may not be implemented")
                     
         else:
-            print(f"❌ Frontend not accessible: HTTP {response.status_code}")
+            lines.append(f"❌ Frontend not accessible: HTTP {response.status_code}")
             
     except Exception as e:
-        print(f"❌ Frontend radar test failed: {e}")
+        lines.append(f"❌ Frontend radar test failed: {e}")
+    return lines
+
+
+async def _run_radar_integration():
+    """Test the weather radar integration"""
+    # Only needed for the header, so don't pay for it at import time
+    from datetime import datetime
+    
+    print("🌧️ Weather Radar Integration Test")
+    print("=" * 40)
+    print(f"Test time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print()
+    
+    # The backend and frontend probes are independent network round-trips,
+    # so run them concurrently and print each report in the original order.
+    # With HTTP/2 the backend requests share one multiplexed connection
+    # when the server supports it.
+    async with httpx.AsyncClient(http2=True, base_url=BACKEND_URL, timeout=10) as client:
+        reports = await asyncio.gather(
+            probe_backend(client),
+            probe_frontend(client),
+            return_exceptions=True
+        )
+    for report in reports:
+        if isinstance(report, Exception):
+            print(f"❌ Radar probe failed: {report}")
+        else:
+            print("\n".join(report))
     
     # Test radar service integration
     print("\n" + "=" * 40)
@@ -170,5 +192,10 @@ def test_radar_integration():
     return True
 
 
+def test_radar_integration():
+    """Run the radar integration check from a synchronous test runner"""
+    asyncio.run(_run_radar_integration())
+
+
 if __name__ == "__main__":
-    test_radar_integration()
+    asyncio.run(_run_radar_integration())
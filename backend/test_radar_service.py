@@ -7,6 +7,7 @@ Test the radar service to see if it's working correctly.
 import os
 import sys
 import django
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the backend directory to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -46,8 +47,23 @@ def test_radar_service():
     except Exception as e:
         print(f"❌ Error testing get_latest_radar_data: {e}")
     
+    # Test request coalescing
+    print("\n3. Testing concurrent get_latest_radar_data calls...")
+    try:
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            results = list(executor.map(
+                lambda _: radar_service.get_latest_radar_data('velocity'), range(20)
+            ))
+        distinct = {id(result) for result in results}
+        if len(distinct) == 1:
+            print("✅ 20 concurrent calls shared a single fetch")
+        else:
+            print(f"⚠️ 20 concurrent calls produced {len(distinct)} fetches")
+    except Exception as e:
+        print(f"❌ Error testing request coalescing: {e}")
+    
     # Test generate_radar_overlay
-    print("\n3. Testing generate_radar_overlay...")
+    print("\n4. Testing generate_radar_overlay...")
     try:
         if radar_data:
             bounds = [38.5, -106.0, 41.0, -103.0]
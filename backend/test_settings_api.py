@@ -6,7 +6,7 @@ Test script to verify the settings API works correctly.
 import os
 import sys
 import django
-import json
+import orjson
 
 # Add the project root to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -15,19 +15,35 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aprs_server.settings')
 django.setup()
 
-from django.test import Client
+from importlib import import_module
+
+from django.conf import settings
+from django.test import RequestFactory
+from websockets.settings_api import user_settings
+
+SETTINGS_URL = '/api/websockets/settings/'
+
+
+def call_view(request, session):
+    """Call the settings view directly, skipping URL routing and middleware."""
+    # SessionMiddleware is bypassed, so attach the session it would provide
+    request.session = session
+    response = user_settings(request)
+    return response, orjson.loads(response.content)
+
 
 def test_settings_api():
     """Test the settings API endpoints."""
     print("Testing Settings API...")
     
-    client = Client()
+    factory = RequestFactory()
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
     
     # Test GET request (should return empty settings initially)
     print("\n1. Testing GET request:")
-    response = client.get('/api/websockets/settings/')
+    response, data = call_view(factory.get(SETTINGS_URL), session)
     print(f"Status: {response.status_code}")
-    print(f"Response: {response.json()}")
+    print(f"Response: {data}")
     
     # Test POST request (save settings)
     print("\n2. Testing POST request:")
@@ -78,17 +94,17 @@ def test_settings_api():
         }
     }
     
-    response = client.post('/api/websockets/settings/', 
-                          data=json.dumps({'settings': test_settings}),
-                          content_type='application/json')
+    request = factory.post(SETTINGS_URL,
+                           data=orjson.dumps({'settings': test_settings}),
+                           content_type='application/json')
+    response, data = call_view(request, session)
     print(f"Status: {response.status_code}")
-    print(f"Response: {response.json()}")
+    print(f"Response: {data}")
     
     # Test GET request again (should return saved settings)
     print("\n3. Testing GET request after save:")
-    response = client.get('/api/websockets/settings/')
+    response, data = call_view(factory.get(SETTINGS_URL), session)
     print(f"Status: {response.status_code}")
-    data = response.json()
     print(f"Response: {data}")
     
     # Verify settings were saved correctly
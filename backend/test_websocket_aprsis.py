@@ -4,13 +4,134 @@ Test WebSocket APRS-IS connection functionality
 """
 import asyncio
 import websockets.asyncio.client as ws
-import json
+from websockets.exceptions import ConnectionClosed
+import orjson
 import logging
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Dropped connections tolerated before the test gives up
+MAX_RECONNECTS = 3
+
+TYPE_KEY = '"type":'
+
+def frame_type(message):
+    """Message type from the head of a frame, or None if it isn't there"""
+    # The consumers put "type" first, so slice it out without a full parse
+    start = message.find(TYPE_KEY, 0, 128)
+    if start < 0:
+        return None
+    start = message.find('"', start + len(TYPE_KEY), start + len(TYPE_KEY) + 8)
+    end = message.find('"', start + 1) if start >= 0 else -1
+    return message[start + 1:end] if end > start else None
+
+def print_station_update(data):
+    """Report a station update frame"""
+    print(f"🎉 Received station update: {data.get('station', {}).get('callsign', 'unknown')}")
+
+def print_packet_update(data):
+    """Report a packet update frame"""
+    print(f"📦 Received packet: {data.get('packet', {}).get('source_callsign', 'unknown')}")
+
+# Frame types whose payload is worth decoding while watching for station data
+STATION_HANDLERS = {
+    'station_update': print_station_update,
+    'packet_update': print_packet_update,
+}
+
+async def wait_for_aprsis(websocket):
+    """Read messages until the server reports APRS-IS as connected"""
+    async for message in websocket:
+        data = orjson.loads(message)
+        print(f"📨 Received: {data.get('type', 'unknown')} - {data}")
+        if data.get('type') == 'aprsis_status' and data.get('connected'):
+            return True
+    return False
+
+async def watch_station_data(websocket):
+    """Print station and packet updates until the connection closes"""
+    async for message in websocket:
+        message_type = frame_type(message)
+        # Only frames with a handler (or no readable type) get decoded
+        if message_type is None or message_type in STATION_HANDLERS:
+            data = orjson.loads(message)
+            message_type = data.get('type', 'unknown')
+            handler = STATION_HANDLERS.get(message_type)
+            if handler:
+                handler(data)
+        print(f"📨 Message: {message_type}")
+
+async def run_session(websocket):
+    """Request an APRS-IS connection and report what the server sends back"""
+    print("✅ WebSocket connected!")
+    
+    # Send APRS-IS connection request
+    test_settings = {
+        'callsign': 'N0CALL',
+        'passcode': -1,  # Receive-only mode
+        'location': {
+            'latitude': 39.7392,
+            'longitude': -104.9847
+        },
+        'aprsIsFilters': {
+            'distanceRange': 100,
+            'stationTypes': ['all'],
+            'enableWeather': True,
+            'enableMessages': True
+        }
+    }
+    
+    connect_message = {
+        'type': 'connect_aprsis',
+        'user_settings': test_settings
+    }
+    
+    print("📤 Sending APRS-IS connection request...")
+    # Decode to str so the frame goes out as text, which the consumer expects
+    await websocket.send(orjson.dumps(connect_message).decode())
+    
+    # Listen for responses
+    print("👂 Listening for responses...")
+    connected = False
+    try:
+        connected = await asyncio.wait_for(wait_for_aprsis(websocket), timeout=30)
+    except asyncio.TimeoutError:
+        print("⏰ Timeout waiting for APRS-IS connection")
+    except ConnectionClosed:
+        raise
+    except Exception as e:
+        print(f"❌ Error receiving message: {e}")
+    
+    if connected:
+        print("✅ APRS-IS connected via WebSocket!")
+        
+        # Wait for station data
+        print("⏳ Waiting for station data...")
+        try:
+            await asyncio.wait_for(watch_station_data(websocket), timeout=15)
+        except asyncio.TimeoutError:
+            pass
+        
+    # Disconnect
+    disconnect_message = {'type': 'disconnect_aprsis'}
+    await websocket.send(orjson.dumps(disconnect_message).decode())
+    print("📤 Sent disconnect request")
+
+async def connect_and_run(uri):
+    """Run the session, letting the client reconnect with backoff on drops"""
+    drops = 0
+    async for websocket in ws.connect(uri, ping_interval=20):
+        try:
+            await run_session(websocket)
+            return
+        except ConnectionClosed:
+            drops += 1
+            if drops >= MAX_RECONNECTS:
+                raise
+            print("🔄 Connection dropped, reconnecting...")
+
 async def test_websocket_aprsis():
     """Test WebSocket APRS-IS connection"""
     print("🔍 Testing WebSocket APRS-IS connection...")
@@ -20,79 +141,11 @@ async def test_websocket_aprsis():
         uri = "ws://localhost:8000/ws/aprs/"
         print(f"Connecting to {uri}...")
         
-        async with ws.connect(uri) as websocket:
-            print("✅ WebSocket connected!")
-            
-            # Send APRS-IS connection request
-            test_settings = {
-                'callsign': 'N0CALL',
-                'passcode': -1,  # Receive-only mode
-                'location': {
-                    'latitude': 39.7392,
-                    'longitude': -104.9847
-                },
-                'aprsIsFilters': {
-                    'distanceRange': 100,
-                    'stationTypes': ['all'],
-                    'enableWeather': True,
-                    'enableMessages': True
-                }
-            }
-            
-            connect_message = {
-                'type': 'connect_aprsis',
-                'user_settings': test_settings
-            }
-            
-            print("📤 Sending APRS-IS connection request...")
-            await websocket.send(json.dumps(connect_message))
-            
-            # Listen for responses
-            print("👂 Listening for responses...")
-            timeout_count = 0
-            max_timeout = 30  # 30 seconds
-            
-            while timeout_count < max_timeout:
-                try:
-                    message = await asyncio.wait_for(websocket.recv(), timeout=1.0)
-                    data = json.loads(message)
-                    print(f"📨 Received: {data.get('type', 'unknown')} - {data}")
-                    
-                    if data.get('type') == 'aprsis_status' and data.get('connected'):
-                        print("✅ APRS-IS connected via WebSocket!")
-                        
-                        # Wait for station data
-                        print("⏳ Waiting for station data...")
-                        station_timeout = 0
-                        while station_timeout < 15:
-                            try:
-                                message = await asyncio.wait_for(websocket.recv(), timeout=1.0)
-                                data = json.loads(message)
-                                if data.get('type') == 'station_update':
-                                    print(f"🎉 Received station update: {data.get('station', {}).get('callsign', 'unknown')}")
-                                elif data.get('type') == 'packet_update':
-                                    print(f"📦 Received packet: {data.get('packet', {}).get('source_callsign', 'unknown')}")
-                                print(f"📨 Message: {data.get('type', 'unknown')}")
-                            except asyncio.TimeoutError:
-                                station_timeout += 1
-                                continue
-                        break
-                        
-                except asyncio.TimeoutError:
-                    timeout_count += 1
-                    continue
-                except Exception as e:
-                    print(f"❌ Error receiving message: {e}")
-                    break
-            
-            if timeout_count >= max_timeout:
-                print("⏰ Timeout waiting for APRS-IS connection")
-                
-            # Disconnect
-            disconnect_message = {'type': 'disconnect_aprsis'}
-            await websocket.send(json.dumps(disconnect_message))
-            print("📤 Sent disconnect request")
+        # The client retries failed connects on its own, so bound the whole run
+        await asyncio.wait_for(connect_and_run(uri), timeout=120)
             
+    except asyncio.TimeoutError:
+        print("⏰ Gave up connecting to the WebSocket")
     except Exception as e:
         print(f"❌ WebSocket test error: {e}")
     
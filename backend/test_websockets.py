@@ -8,6 +8,35 @@ import websockets
 import json
 import sys
 
+async def probe(endpoint):
+    """Connect to one WebSocket endpoint and send a test subscription"""
+    lines = [f"\nTesting WebSocket connection to: {endpoint}"]
+    try:
+        async with websockets.connect(endpoint) as websocket:
+            lines.append(f"✅ Connected to {endpoint}")
+            
+            # Send a test subscription message
+            test_message = {
+                "type": "subscribe",
+                "filters": {
+                    "callsign": "TEST"
+                }
+            }
+            
+            await websocket.send(json.dumps(test_message))
+            lines.append(f"📤 Sent subscription message")
+            
+            # Wait for a response (with timeout)
+            try:
+                response = await asyncio.wait_for(websocket.recv(), timeout=5.0)
+                lines.append(f"📥 Received: {response}")
+            except asyncio.TimeoutError:
+                lines.append("⏰ No response received within 5 seconds")
+                
+    except Exception as e:
+        lines.append(f"❌ Failed to connect to {endpoint}: {e}")
+    return lines
+
 async def test_websocket_connection():
     """Test WebSocket connection to APRSwx backend"""
     
@@ -18,32 +47,14 @@ async def test_websocket_connection():
         "ws://127.0.0.1:8000/ws/weather/"
     ]
     
-    for endpoint in endpoints:
-        print(f"\nTesting WebSocket connection to: {endpoint}")
-        try:
-            async with websockets.connect(endpoint) as websocket:
-                print(f"✅ Connected to {endpoint}")
-                
-                # Send a test subscription message
-                test_message = {
-                    "type": "subscribe",
-                    "filters": {
-                        "callsign": "TEST"
-                    }
-                }
-                
-                await websocket.send(json.dumps(test_message))
-                print(f"📤 Sent subscription message")
-                
-                # Wait for a response (with timeout)
-                try:
-                    response = await asyncio.wait_for(websocket.recv(), timeout=5.0)
-                    print(f"📥 Received: {response}")
-                except asyncio.TimeoutError:
-                    print("⏰ No response received within 5 seconds")
-                    
-        except Exception as e:
-            print(f"❌ Failed to connect to {endpoint}: {e}")
+    # The endpoints are independent, so probe them all at once and
+    # print each report in endpoint order
+    reports = await asyncio.gather(*[probe(e) for e in endpoints], return_exceptions=True)
+    for endpoint, report in zip(endpoints, reports):
+        if isinstance(report, Exception):
+            print(f"\n❌ Failed to probe {endpoint}: {report}")
+        else:
+            print("\n".join(report))
 
 if __name__ == "__main__":
     print("🚀 Starting WebSocket connection tests...")
@@ -0,0 +1,105 @@
+"""
+Geospatial Helpers
+
+Geohash bucketing and great-circle distance used to find weather stations
+near a point without scanning every row.
+"""
+
+from math import cos, radians
+
+import numpy as np
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 7  # ~150 m cells, the precision stored on stations
+
+EARTH_RADIUS_KM = 6371
+
+# Approximate (lat, lon) size in degrees of a cell at each geohash precision
+_CELL_DEGREES = {
+    1: (45.0, 45.0),
+    2: (5.625, 11.25),
+    3: (1.40625, 1.40625),
+    4: (0.17578125, 0.3515625),
+    5: (0.0439453125, 0.0439453125),
+    6: (0.0054931640625, 0.010986328125),
+    7: (0.001373291015625, 0.001373291015625),
+}
+
+
+def encode_geohash(lat, lon, precision=GEOHASH_PRECISION):
+    """Encode a coordinate as a base-32 geohash string"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        interval, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def covering_geohashes(lat, lon, radius_km):
+    """
+    Geohash prefixes whose cells together cover a circle
+
+    Picks the finest precision whose cells are still at least as large as the
+    radius, so the result is usually the center cell and its neighbors.
+    """
+    lat_delta = radius_km / 111.0
+    lon_delta = radius_km / (111.0 * max(cos(radians(lat)), 0.01))
+
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        cell_lat, cell_lon = _CELL_DEGREES[candidate]
+        if cell_lat >= lat_delta and cell_lon >= lon_delta:
+            precision = candidate
+            break
+
+    # Sample the bounding box at half-cell spacing so no cell is skipped.
+    # Longitudes are not clamped: a box crossing the antimeridian runs past
+    # +/-180 and each sample is wrapped back, covering both sides.
+    cell_lat, cell_lon = _CELL_DEGREES[precision]
+    south, north = max(lat - lat_delta, -90.0), min(lat + lat_delta, 90.0)
+    if lon_delta >= 180.0:
+        west, east = -180.0, 180.0
+    else:
+        west, east = lon - lon_delta, lon + lon_delta
+    lat_steps = int((north - south) / (cell_lat / 2)) + 1
+    lon_steps = int((east - west) / (cell_lon / 2)) + 1
+
+    prefixes = set()
+    for i in range(lat_steps + 1):
+        sample_lat = min(south + i * cell_lat / 2, north)
+        for j in range(lon_steps + 1):
+            sample_lon = min(west + j * cell_lon / 2, east)
+            sample_lon = (sample_lon + 180.0) % 360.0 - 180.0
+            prefixes.add(encode_geohash(sample_lat, sample_lon, precision))
+    return sorted(prefixes)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in kilometers
+
+    Accepts scalars or arrays (broadcast together), so one call can measure
+    from a point to many stations at once.
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
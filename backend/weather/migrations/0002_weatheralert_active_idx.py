@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='weatheralert',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_cancelled', False)), fields=['expires_at', 'effective_at'], name='wx_alert_active_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:10
+
+from django.db import migrations
+
+# Append-only timestamp columns that get a BRIN summary index on PostgreSQL
+BRIN_INDEXES = [
+    ('wx_sweep_time_brin', 'weather_radarsweep', 'sweep_time'),
+    ('wx_obs_time_brin', 'weather_weatherobservation', 'observation_time'),
+    ('wx_composite_time_brin', 'weather_radarcomposite', 'composite_time'),
+]
+
+
+def create_brin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in BRIN_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING brin ({column}) WITH (pages_per_range = 128)'
+        )
+
+
+def drop_brin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in BRIN_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0002_weatheralert_active_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_brin_indexes, drop_brin_indexes),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:06
+
+from django.db import migrations, models
+
+
+def create_quality_flags_gin(apps, schema_editor):
+    # quality_flags stays jsonb and is the column queried by key
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS wx_obs_quality_flags_gin '
+        'ON weather_weatherobservation USING gin (quality_flags)'
+    )
+
+
+def drop_quality_flags_gin(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS wx_obs_quality_flags_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0003_brin_time_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='radarproduct',
+            name='color_scale',
+            field=models.TextField(blank=True, default='{}', help_text='Color scale for visualization (JSON object)'),
+        ),
+        migrations.AlterField(
+            model_name='weatherobservation',
+            name='raw_data',
+            field=models.TextField(blank=True, default='{}'),
+        ),
+        migrations.RunPython(create_quality_flags_gin, drop_quality_flags_gin),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0004_json_text_fields'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='radarsweep',
+            name='weather_rad_site_id_918934_idx',
+        ),
+        migrations.AddIndex(
+            model_name='radarsweep',
+            index=models.Index(fields=['site', 'product', '-sweep_time'], name='weather_rad_site_id_04bc0a_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0005_radarsweep_latest_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='weatherstation',
+            name='latitude',
+            field=models.FloatField(default=0.0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='weatherstation',
+            name='longitude',
+            field=models.FloatField(default=0.0),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='weatherstation',
+            index=models.Index(fields=['latitude', 'longitude'], name='weather_wea_latitud_656626_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:20
+
+from django.db import migrations, models
+
+from weather.geo import encode_geohash
+
+
+def backfill_geohash(apps, schema_editor):
+    WeatherStation = apps.get_model('weather', 'WeatherStation')
+    stations = list(WeatherStation.objects.only('pk', 'latitude', 'longitude'))
+    for station in stations:
+        station.geohash = encode_geohash(station.latitude, station.longitude)
+    WeatherStation.objects.bulk_update(stations, ['geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0006_weatherstation_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='weatherstation',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Geohash of the location, kept in sync on save', max_length=12),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:25
+
+from django.db import migrations
+
+OBSERVATION_TABLE = 'weather_weatherobservation'
+
+
+def create_observation_hypertable(apps, schema_editor):
+    # Only PostgreSQL databases with the TimescaleDB extension are converted
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'")
+        if cursor.fetchone() is None:
+            return
+
+        # Hypertable unique indexes must include the partition column, so the
+        # primary key becomes (id, observation_time); id stays unique
+        cursor.execute(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'p'",
+            [OBSERVATION_TABLE]
+        )
+        primary_key = cursor.fetchone()
+        if primary_key:
+            cursor.execute(f'ALTER TABLE {OBSERVATION_TABLE} DROP CONSTRAINT "{primary_key[0]}"')
+        cursor.execute(f'ALTER TABLE {OBSERVATION_TABLE} ADD PRIMARY KEY (id, observation_time)')
+
+        cursor.execute(
+            "SELECT create_hypertable(%s, 'observation_time', "
+            "chunk_time_interval => INTERVAL '1 day', migrate_data => true, if_not_exists => true)",
+            [OBSERVATION_TABLE]
+        )
+        cursor.execute(
+            f"ALTER TABLE {OBSERVATION_TABLE} SET "
+            f"(timescaledb.compress, timescaledb.compress_segmentby = 'station_id')"
+        )
+        cursor.execute(
+            "SELECT add_compression_policy(%s, INTERVAL '7 days', if_not_exists => true)",
+            [OBSERVATION_TABLE]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0007_weatherstation_geohash'),
+    ]
+
+    operations = [
+        # A hypertable cannot be turned back into a plain table in place
+        migrations.RunPython(create_observation_hypertable, migrations.RunPython.noop),
+    ]
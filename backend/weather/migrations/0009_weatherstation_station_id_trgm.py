@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:30
+
+from django.db import migrations
+
+
+def create_station_id_trgm(apps, schema_editor):
+    # Django compiles icontains to UPPER(column) LIKE UPPER(pattern), so the
+    # trigram index has to be on the same expression to be usable
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS wx_station_id_trgm '
+        'ON weather_weatherstation USING gin (UPPER(station_id) gin_trgm_ops)'
+    )
+
+
+def drop_station_id_trgm(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS wx_station_id_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0008_weatherobservation_hypertable'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_station_id_trgm, drop_station_id_trgm),
+    ]
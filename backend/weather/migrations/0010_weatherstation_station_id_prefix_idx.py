@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:35
+
+from django.db import migrations
+
+
+def create_station_id_prefix_index(apps, schema_editor):
+    # istartswith compiles to UPPER(column) LIKE 'PREFIX%'; text_pattern_ops
+    # lets a btree serve that under any collation
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS wx_station_id_upper_idx '
+        'ON weather_weatherstation (UPPER(station_id) text_pattern_ops)'
+    )
+
+
+def drop_station_id_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS wx_station_id_upper_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0009_weatherstation_station_id_trgm'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_station_id_prefix_index, drop_station_id_prefix_index),
+    ]
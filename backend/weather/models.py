@@ -6,9 +6,27 @@ including radar data, weather alerts, and meteorological information.
 """
 
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Now
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
-import json
+import numpy as np
+import orjson
+
+from .geo import covering_geohashes, encode_geohash, haversine_km
+
+
+def decode_json_object(value):
+    """Decode a JSON object stored as text, falling back to an empty dict"""
+    if not value:
+        return {}
+    try:
+        decoded = orjson.loads(value)
+    except orjson.JSONDecodeError:
+        return {}
+    return decoded if isinstance(decoded, dict) else {}
 
 
 class RadarSite(models.Model):
@@ -61,7 +79,7 @@ class RadarProduct(models.Model):
     units = models.CharField(max_length=50, help_text="Data units (e.g., dBZ, m/s)")
     
     # Display properties
-    color_scale = models.JSONField(default=dict, help_text="Color scale for visualization")
+    color_scale = models.TextField(blank=True, default='{}', help_text="Color scale for visualization (JSON object)")
     min_value = models.FloatField(help_text="Minimum data value")
     max_value = models.FloatField(help_text="Maximum data value")
     
@@ -73,6 +91,87 @@ class RadarProduct(models.Model):
     
     def __str__(self):
         return f"{self.product_code} - {self.description}"
+    
+    def get_color_scale(self):
+        """Get color scale as dict"""
+        return decode_json_object(self.color_scale)
+
+
+class ReferenceRegistry:
+    """
+    Per-process cache of a small, rarely changing reference table.
+    
+    Rows are loaded on first use and kept by both their code and primary key;
+    saving or deleting a row clears the cache so the next lookup reloads it.
+    Those signals only fire in the process that made the change, so a miss
+    checks the database once for rows added elsewhere before giving up.
+    """
+    
+    model = None
+    key_field = None
+    _by_key = None
+    _by_pk = None
+    
+    @classmethod
+    def _load(cls):
+        if cls._by_key is None:
+            rows = list(cls.model.objects.all())
+            cls._by_pk = {row.pk: row for row in rows}
+            cls._by_key = {getattr(row, cls.key_field): row for row in rows}
+        return cls._by_key, cls._by_pk
+    
+    @classmethod
+    def _fetch(cls, **lookup):
+        """Load one row missing from the cache and add it, or None if absent"""
+        row = cls.model.objects.filter(**lookup).first()
+        if row is not None:
+            by_key, by_pk = cls._load()
+            by_pk[row.pk] = row
+            by_key[getattr(row, cls.key_field)] = row
+        return row
+    
+    @classmethod
+    def get(cls, key):
+        """Row for a code (e.g. site ID), or None if unknown"""
+        row = cls._load()[0].get(key)
+        if row is None:
+            row = cls._fetch(**{cls.key_field: key})
+        return row
+    
+    @classmethod
+    def get_by_pk(cls, pk):
+        """Row for a primary key, or None if unknown"""
+        row = cls._load()[1].get(pk)
+        if row is None:
+            row = cls._fetch(pk=pk)
+        return row
+    
+    @classmethod
+    def clear(cls):
+        cls._by_key = None
+        cls._by_pk = None
+
+
+class RadarSiteRegistry(ReferenceRegistry):
+    """Radar sites by site_id"""
+    model = RadarSite
+    key_field = 'site_id'
+
+
+class RadarProductRegistry(ReferenceRegistry):
+    """Radar products by product_code"""
+    model = RadarProduct
+    key_field = 'product_code'
+
+
+@receiver([post_save, post_delete], sender=RadarSite)
+def clear_radar_site_registry(sender, **kwargs):
+    RadarSiteRegistry.clear()
+
+
+@receiver([post_save, post_delete], sender=RadarProduct)
+def clear_radar_product_registry(sender, **kwargs):
+    RadarProductRegistry.clear()
 
 
 class RadarSweep(models.Model):
@@ -102,12 +201,29 @@ class RadarSweep(models.Model):
     class Meta:
         ordering = ['-sweep_time']
         indexes = [
-            models.Index(fields=['site', 'product', 'sweep_time']),
+            # Newest first, matching "latest sweep per site/product" lookups
+            models.Index(fields=['site', 'product', '-sweep_time']),
         ]
         unique_together = ['site', 'product', 'sweep_time', 'elevation_angle']
     
+    @classmethod
+    def bulk_ingest(cls, rows, batch_size=500):
+        """
+        Insert many sweeps at once from field dicts
+        
+        Sweeps already stored for the same site, product, time and elevation
+        are skipped by the database rather than raising.
+        """
+        return cls.objects.bulk_create(
+            [cls(**row) for row in rows],
+            batch_size=batch_size,
+            ignore_conflicts=True
+        )
+    
     def __str__(self):
-        return f"{self.site.site_id} {self.product.product_code} - {self.sweep_time}"
+        site = RadarSiteRegistry.get_by_pk(self.site_id) or self.site
+        product = RadarProductRegistry.get_by_pk(self.product_id) or self.product
+        return f"{site.site_id} {product.product_code} - {self.sweep_time}"
 
 
 class RadarComposite(models.Model):
@@ -138,7 +254,39 @@ class RadarComposite(models.Model):
         ]
     
     def __str__(self):
-        return f"Composite {self.product.product_code} - {self.composite_time}"
+        product = RadarProductRegistry.get_by_pk(self.product_id) or self.product
+        return f"Composite {product.product_code} - {self.composite_time}"
+
+
+class WeatherAlertQuerySet(models.QuerySet):
+    """Query helpers for weather alerts"""
+    
+    def current(self, now=None):
+        """
+        Alerts in effect at `now`
+        
+        Defaults to the database clock; pass a datetime to share one cutoff
+        with other queries in the same request.
+        """
+        if now is None:
+            now = Now()
+        return self.filter(
+            is_active=True,
+            is_cancelled=False,
+            effective_at__lte=now,
+            expires_at__gte=now
+        )
+    
+    def retire_expired(self, now=None):
+        """
+        Clear is_active on alerts that have expired
+        
+        Keeps the partial active-alert index down to live rows; returns the
+        number of alerts retired.
+        """
+        if now is None:
+            now = Now()
+        return self.filter(is_active=True, expires_at__lt=now).update(is_active=False)
 
 
 class WeatherAlert(models.Model):
@@ -192,11 +340,19 @@ class WeatherAlert(models.Model):
     issuing_office = models.CharField(max_length=100)
     source_url = models.URLField(blank=True)
     
+    objects = WeatherAlertQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-issued_at']
         indexes = [
             models.Index(fields=['alert_type', 'is_active']),
             models.Index(fields=['effective_at', 'expires_at']),
+            # Only live alerts are indexed, so current() scans a small range
+            models.Index(
+                fields=['expires_at', 'effective_at'],
+                name='wx_alert_active_idx',
+                condition=Q(is_active=True, is_cancelled=False)
+            ),
         ]
     
     def __str__(self):
@@ -210,6 +366,40 @@ class WeatherAlert(models.Model):
                 self.effective_at <= now <= self.expires_at)
 
 
+class WeatherStationQuerySet(models.QuerySet):
+    """Query helpers for weather stations"""
+    
+    def near(self, lat, lon, radius_km):
+        """
+        Stations within radius_km of a point, nearest first
+        
+        The geohash index narrows the candidates to the cells covering the
+        circle; exact distances are only computed for those rows.
+        """
+        prefix_filter = Q()
+        for prefix in covering_geohashes(lat, lon, radius_km):
+            prefix_filter |= Q(geohash__startswith=prefix)
+        
+        candidates = list(self.filter(prefix_filter))
+        if not candidates:
+            return []
+        
+        # Measure every candidate in one vectorized call
+        distances = haversine_km(
+            lat, lon,
+            np.fromiter((station.latitude for station in candidates), float, len(candidates)),
+            np.fromiter((station.longitude for station in candidates), float, len(candidates))
+        )
+        nearby = []
+        for index in np.argsort(distances):
+            if distances[index] > radius_km:
+                break
+            station = candidates[index]
+            station.distance_km = float(distances[index])
+            nearby.append(station)
+        return nearby
+
+
 class WeatherStation(models.Model):
     """Model for weather observation stations"""
     
@@ -230,6 +420,8 @@ class WeatherStation(models.Model):
     latitude = models.FloatField()
     longitude = models.FloatField()
     elevation = models.FloatField(help_text="Elevation in meters")
+    geohash = models.CharField(max_length=12, db_index=True, blank=True, editable=False,
+                               help_text="Geohash of the location, kept in sync on save")
     
     # Station information
     operator = models.CharField(max_length=100, blank=True)
@@ -246,19 +438,65 @@ class WeatherStation(models.Model):
         help_text="Data quality score (0.0 to 1.0)"
     )
     
+    objects = WeatherStationQuerySet.as_manager()
+    
     class Meta:
         ordering = ['station_id']
+        indexes = [
+            # Bounding-box lookups filter on both coordinates
+            models.Index(fields=['latitude', 'longitude']),
+        ]
     
     def __str__(self):
         return f"{self.station_id} - {self.name}"
     
-    @property
-    def latitude(self):
-        return self.location.y if self.location else None
-    
-    @property
-    def longitude(self):
-        return self.location.x if self.location else None
+    def save(self, *args, **kwargs):
+        """Keep the geohash bucket in sync with the coordinates"""
+        self.geohash = encode_geohash(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+
+
+# Numeric observation columns, in the order they appear in OBS_DTYPE
+OBS_METRIC_FIELDS = (
+    'temperature', 'temperature_dewpoint', 'temperature_windchill', 'temperature_heatindex',
+    'pressure', 'pressure_tendency', 'humidity',
+    'wind_speed', 'wind_direction', 'wind_gust',
+    'precipitation_1h', 'precipitation_6h', 'precipitation_24h',
+    'visibility', 'cloud_base', 'solar_radiation', 'uv_index',
+)
+
+# Packed record layout for bulk observation reads; missing values are NaN
+OBS_DTYPE = np.dtype(
+    [('observation_time', 'M8[us]'), ('station_id', 'i8')] +
+    [(field, 'f4') for field in OBS_METRIC_FIELDS]
+)
+
+
+class WeatherObservationQuerySet(models.QuerySet):
+    """Query helpers for weather observations"""
+    
+    def metrics_array(self):
+        """
+        Observations as one NumPy record array (OBS_DTYPE)
+        
+        Skips model instantiation entirely, so analytics and plotting can work
+        column-wise (e.g. arr['temperature']) over many rows at once.
+        """
+        rows = list(self.values_list('observation_time', 'station_id', *OBS_METRIC_FIELDS))
+        metrics = np.empty(len(rows), dtype=OBS_DTYPE)
+        if not rows:
+            return metrics
+        
+        # Times are stored in UTC; datetime64 has no timezone
+        metrics['observation_time'] = [row[0].replace(tzinfo=None) for row in rows]
+        metrics['station_id'] = [row[1] for row in rows]
+        values = np.array([row[2:] for row in rows], dtype=float)  # None -> NaN
+        for index, field in enumerate(OBS_METRIC_FIELDS):
+            metrics[field] = values[:, index]
+        return metrics
 
 
 class WeatherObservation(models.Model):
@@ -315,8 +553,10 @@ class WeatherObservation(models.Model):
     quality_flags = models.JSONField(default=dict, blank=True)
     is_quality_controlled = models.BooleanField(default=False)
     
-    # Raw data
-    raw_data = models.JSONField(default=dict, blank=True)
+    # Raw data, only ever read back whole, so kept as JSON text
+    raw_data = models.TextField(blank=True, default='{}')
+    
+    objects = WeatherObservationQuerySet.as_manager()
     
     class Meta:
         ordering = ['-observation_time']
@@ -327,6 +567,10 @@ class WeatherObservation(models.Model):
     
     def __str__(self):
         return f"{self.station.station_id} - {self.observation_time}"
+    
+    def get_raw_data(self):
+        """Get raw observation data as dict"""
+        return decode_json_object(self.raw_data)
 
 
 class RadarAnimation(models.Model):
@@ -363,4 +607,5 @@ class RadarAnimation(models.Model):
         ]
     
     def __str__(self):
-        return f"Animation {self.product.product_code} - {self.start_time} to {self.end_time}"
+        product = RadarProductRegistry.get_by_pk(self.product_id) or self.product
+        return f"Animation {product.product_code} - {self.start_time} to {self.end_time}"
@@ -7,21 +7,91 @@ from NOAA's NCEP MRMS system.
 
 import os
 import tempfile
+import threading
+import time
+from concurrent.futures import Future
 import numpy as np
-import matplotlib.pyplot as plt
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
+from matplotlib import cm
+from PIL import Image
 from datetime import datetime, timedelta
+from functools import cached_property, lru_cache
+from urllib.parse import quote, urlencode
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import base64
+import hashlib
 from io import BytesIO
 from django.conf import settings
 from django.core.cache import cache
+from .geo import haversine_km
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Reflectivity color table: one RGBA entry per 5 dBZ bin from -10 dBZ up,
+# alpha 0.7; built once at import rather than per render
+_DBZ_LEVELS = np.arange(-10, 70, 5)  # dBZ levels
+_DBZ_COLORS = (cm.nipy_spectral(np.linspace(0, 1, len(_DBZ_LEVELS))) * 255).astype(np.uint8)
+_DBZ_COLORS[:, 3] = 178
+
+# Each worker thread reuses one PNG encode buffer across overlay renders
+_overlay_buffers = threading.local()
+
+
+def _overlay_buffer():
+    """Empty the calling thread's PNG buffer and return it"""
+    buffer = getattr(_overlay_buffers, 'buffer', None)
+    if buffer is None:
+        buffer = _overlay_buffers.buffer = BytesIO()
+    buffer.seek(0)
+    buffer.truncate()
+    return buffer
+
+
+# Per-thread scratch arrays for mock radar noise, one per grid shape
+_noise_buffers = threading.local()
+
+
+def _noise_scratch(shape):
+    """Reusable float64 array of the given shape for the calling thread"""
+    buffers = getattr(_noise_buffers, 'by_shape', None)
+    if buffers is None:
+        buffers = _noise_buffers.by_shape = {}
+    scratch = buffers.get(shape)
+    if scratch is None:
+        scratch = buffers[shape] = np.empty(shape)
+    return scratch
+
+
+@lru_cache(maxsize=1024)
+def _wms_url_cached(product, bounds):
+    """Build the Iowa Environmental Mesonet WMS URL for a bounds tuple"""
+    # Use a working WMS service - Iowa Environmental Mesonet
+    wms_base = "https://mesonet.agron.iastate.edu/cgi-bin/wms/nexrad/n0r.cgi"
+    
+    south, west, north, east = bounds
+    
+    # Build WMS parameters
+    params = {
+        'SERVICE': 'WMS',
+        'VERSION': '1.1.1',
+        'REQUEST': 'GetMap',
+        'LAYERS': 'nexrad-n0r',
+        'STYLES': '',
+        'SRS': 'EPSG:4326',
+        'BBOX': f'{west},{south},{east},{north}',
+        'WIDTH': '512',
+        'HEIGHT': '512',
+        'FORMAT': 'image/png',
+        'TRANSPARENT': 'true'
+    }
+    
+    wms_url = f"{wms_base}?{urlencode(params, quote_via=quote)}"
+    
+    logger.info(f"Generated Iowa Mesonet WMS radar URL: {wms_url}")
+    return wms_url
+
 
 class WeatherRadarService:
     """Service for fetching and processing MRMS weather radar data"""
@@ -30,6 +100,26 @@ class WeatherRadarService:
         self.mrms_base_url = 'https://mrms.ncep.noaa.gov/data'
         self.cache_timeout = 300  # 5 minutes
         
+        # Pooled session for MRMS/WMS requests so connections and TLS
+        # sessions are reused across fetches
+        self.request_timeout = (2, 10)  # (connect, read) seconds
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+        
+        # Identical data requests arriving together share one fetch, and a
+        # result stays reusable for a short window to absorb UI bursts
+        self.coalesce_window = 0.1  # seconds
+        self._inflight = {}
+        self._recent = {}
+        self._inflight_lock = threading.Lock()
+        
         # MRMS product types
         self.mrms_products = {
             'reflectivity': 'MergedReflectivityQComposite',
@@ -53,24 +143,32 @@ class WeatherRadarService:
         Returns:
             List of MRMS products available
         """
-        # MRMS provides national coverage, so we return all available products
-        available_products = []
-        for product_key, product_name in self.mrms_products.items():
-            available_products.append({
+        # MRMS provides national coverage, so every location gets the same
+        # catalogue; hand out copies so callers can't mutate the cached one
+        return [dict(product) for product in self.available_products]
+    
+    @cached_property
+    def available_products(self):
+        """MRMS product catalogue, built once per service instance"""
+        return tuple(
+            {
                 'product_id': product_key,
                 'product_name': product_name,
                 'name': product_key.replace('_', ' ').title(),
                 'coverage': 'National (CONUS)',
                 'resolution': '1 km',
                 'update_frequency': '2-5 minutes'
-            })
-                
-        return available_products
+            }
+            for product_key, product_name in self.mrms_products.items()
+        )
     
     def get_latest_radar_data(self, product='reflectivity', bounds=None):
         """
         Fetch the latest MRMS radar data for a given product
         
+        Concurrent calls for the same product and bounds wait on a single
+        fetch, and its result is reused for `coalesce_window` seconds.
+        
         Args:
             product: MRMS product type ('reflectivity', 'velocity', etc.)
             bounds: Optional bounds [south, west, north, east]
@@ -78,6 +176,43 @@ class WeatherRadarService:
         Returns:
             Radar data object or None if not available
         """
+        key = (product, tuple(bounds) if bounds else None)
+        
+        with self._inflight_lock:
+            recent = self._recent.get(key)
+            if recent and time.monotonic() - recent[0] < self.coalesce_window:
+                return recent[1]
+            
+            future = self._inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not is_owner:
+            return future.result()
+        
+        try:
+            result = self._fetch_radar_data(product, bounds)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+        
+        with self._inflight_lock:
+            now = time.monotonic()
+            self._recent = {
+                k: v for k, v in self._recent.items()
+                if now - v[0] < self.coalesce_window
+            }
+            self._recent[key] = (now, result)
+        future.set_result(result)
+        return result
+    
+    def _fetch_radar_data(self, product, bounds):
+        """Fetch radar data without request coalescing"""
         # For development/testing, return mock data
         use_mock = getattr(settings, 'RADAR_USE_MOCK_DATA', True)
         if use_mock:
@@ -159,32 +294,8 @@ class WeatherRadarService:
             WMS radar URL or None
         """
         try:
-            # Use a working WMS service - Iowa Environmental Mesonet
-            wms_base = "https://mesonet.agron.iastate.edu/cgi-bin/wms/nexrad/n0r.cgi"
-            
-            south, west, north, east = bounds
-            
-            # Build WMS parameters
-            params = {
-                'SERVICE': 'WMS',
-                'VERSION': '1.1.1',
-                'REQUEST': 'GetMap',
-                'LAYERS': 'nexrad-n0r',
-                'STYLES': '',
-                'SRS': 'EPSG:4326',
-                'BBOX': f'{west},{south},{east},{north}',
-                'WIDTH': '512',
-                'HEIGHT': '512',
-                'FORMAT': 'image/png',
-                'TRANSPARENT': 'true'
-            }
-            
-            # Convert params to query string
-            param_string = '&'.join([f'{k}={v}' for k, v in params.items()])
-            wms_url = f"{wms_base}?{param_string}"
-            
-            logger.info(f"Generated Iowa Mesonet WMS radar URL: {wms_url}")
-            return wms_url
+            # The URL only depends on product and bounds, so reuse built ones
+            return _wms_url_cached(product, tuple(float(value) for value in bounds))
             
         except Exception as e:
             logger.error(f"Error generating WMS radar URL: {e}")
@@ -202,68 +313,76 @@ class WeatherRadarService:
         Returns:
             Base64 encoded PNG image data
         """
-        try:
-            # Create figure
-            fig, ax = plt.subplots(1, 1, figsize=(size[0]/100, size[1]/100), 
-                                 subplot_kw={'projection': ccrs.PlateCarree()})
-            
-            # Set map bounds if provided
-            if bounds:
-                ax.set_extent(bounds, crs=ccrs.PlateCarree())
-            
-            # Plot reflectivity data
-            reflectivity = np.array(radar_data['reflectivity'])
-            lat = np.array(radar_data['latitude'])
-            lon = np.array(radar_data['longitude'])
-            
-            # Create color map for reflectivity
-            levels = np.arange(-10, 70, 5)  # dBZ levels
-            colors = plt.cm.nipy_spectral(np.linspace(0, 1, len(levels)))
-            
-            # Plot radar data
-            cs = ax.contourf(lon, lat, reflectivity, levels=levels, 
-                           colors=colors, alpha=0.7, transform=ccrs.PlateCarree())
-            
-            # Remove axes and make transparent
-            ax.set_xticks([])
-            ax.set_yticks([])
-            # Remove spines instead of outline
-            for spine in ax.spines.values():
-                spine.set_visible(False)
-            
-            # Save to base64 string
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', transparent=True, 
-                       bbox_inches='tight', pad_inches=0, dpi=100)
-            buffer.seek(0)
-            
-            # Encode as base64
-            image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            
-            plt.close(fig)
-            buffer.close()
-            
-            return image_base64
+        png_bytes = self.render_overlay_png(radar_data, bounds, size)
+        if png_bytes is None:
+            return None
+        return base64.b64encode(png_bytes).decode('utf-8')
+    
+    def render_overlay_png(self, radar_data, bounds=None, size=(512, 512)):
+        """
+        Render a radar overlay as raw PNG bytes
+        
+        Args:
+            radar_data: Processed radar data dictionary
+            bounds: Map bounds [south, west, north, east]
+            size: Output image size (width, height)
             
+        Returns:
+            PNG image bytes, or None if rendering failed
+        """
+        # Renders only change when the underlying scan does, so reuse them
+        cache_key = f"mrms_overlay_png_{self.overlay_digest(radar_data, bounds, size)}"
+        cached_image = cache.get(cache_key)
+        if cached_image:
+            logger.info(f"Using cached radar overlay for {radar_data.get('product')}")
+            return cached_image
+        
+        try:
+            reflectivity = np.asarray(radar_data['data'], dtype=float)
+            
+            # Bin each cell to a color table index; anything below the lowest
+            # level (or missing) stays transparent
+            bins = np.floor((reflectivity - _DBZ_LEVELS[0]) / 5)
+            idx = np.clip(np.nan_to_num(bins, nan=-1), 0, len(_DBZ_COLORS) - 1).astype(np.intp)
+            rgba = _DBZ_COLORS[idx]
+            rgba[~(reflectivity >= _DBZ_LEVELS[0]), 3] = 0
+            
+            # Grid rows run south to north, image rows top to bottom; the map
+            # client positions the image from the request bounds
+            image = Image.fromarray(np.ascontiguousarray(rgba[::-1]), 'RGBA')
+            image = image.resize(tuple(size), Image.NEAREST)
+            
+            buffer = _overlay_buffer()
+            image.save(buffer, format='PNG', optimize=False)
+            png_bytes = buffer.getvalue()
+            
+            cache.set(cache_key, png_bytes, self.cache_timeout)
+            return png_bytes
+        
         except Exception as e:
             logger.error(f"Error generating radar overlay: {e}")
             return None
     
+    def overlay_digest(self, radar_data, bounds, size):
+        """
+        Stable digest of one radar scan's overlay, used for cache keys and ETags
+        
+        Hashes the data grid itself rather than the fetch timestamp, which
+        changes on every fetch even when the scan has not.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{radar_data.get('product')}|{bounds}|{tuple(size)}".encode())
+        digest.update(np.ascontiguousarray(radar_data['data'], dtype=float).tobytes())
+        return digest.hexdigest()
+    
+    @staticmethod
+    def haversine_km(lat1, lon1, lat2, lon2):
+        """Great-circle distance in kilometers for scalars or NumPy arrays"""
+        return haversine_km(lat1, lon1, lat2, lon2)
+    
     def _calculate_distance(self, lat1, lon1, lat2, lon2):
         """Calculate distance between two points in kilometers"""
-        from math import radians, cos, sin, asin, sqrt
-        
-        # Convert to radians
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * asin(sqrt(a))
-        r = 6371  # Earth's radius in kilometers
-        
-        return c * r
+        return float(haversine_km(lat1, lon1, lat2, lon2))
     
     def _get_mock_radar_data(self, product='reflectivity', bounds=None, size=50):
         """
@@ -284,8 +403,9 @@ class WeatherRadarService:
             
             south, west, north, east = bounds
             
-            # Generate mock data
-            np.random.seed(42)  # For consistent results
+            # Generate mock data from a local generator so the global NumPy
+            # random state is left alone
+            rng = np.random.default_rng(42)  # For consistent results
             
             # Create coordinate arrays
             lat_range = np.linspace(south, north, size)
@@ -294,51 +414,65 @@ class WeatherRadarService:
             
             # Generate mock data based on product type
             if product == 'reflectivity':
-                # Create storm-like patterns
-                data = np.zeros((size, size))
-                for i in range(3):  # 3 "storm cells"
-                    center_lat = south + np.random.uniform(0.2, 0.8) * (north - south)
-                    center_lon = west + np.random.uniform(0.2, 0.8) * (east - west)
-                    
-                    # Create distance from center
-                    dist = np.sqrt((lat_grid - center_lat)**2 + (lon_grid - center_lon)**2)
-                    
-                    # Create reflectivity pattern (0-70 dBZ)
-                    storm_data = 35 * np.exp(-dist * 10) + np.random.normal(0, 3, (size, size))
-                    storm_data[storm_data < 0] = 0
-                    storm_data[storm_data > 70] = 70
-                    data = np.maximum(data, storm_data)
+                # Create storm-like patterns: 3 "storm cells" computed together
+                # as a (cells, size, size) stack and merged with a max
+                cells = 3
+                center_lat = south + rng.uniform(0.2, 0.8, cells) * (north - south)
+                center_lon = west + rng.uniform(0.2, 0.8, cells) * (east - west)
+                dist = np.sqrt(
+                    (lat_grid[None] - center_lat[:, None, None])**2 +
+                    (lon_grid[None] - center_lon[:, None, None])**2
+                )
+                
+                # Create reflectivity pattern (0-70 dBZ), in place over dist
+                noise = _noise_scratch(dist.shape)
+                rng.standard_normal(out=noise)
+                noise *= 3
+                storms = np.exp(np.multiply(dist, -10, out=dist), out=dist)
+                storms *= 35
+                storms += noise
+                data = np.clip(storms, 0, 70, out=storms).max(axis=0)
             
             elif product == 'velocity':
                 # Create velocity pattern (-30 to 30 m/s)
-                data = 15 * np.sin(lat_grid * 5) * np.cos(lon_grid * 5) + np.random.normal(0, 3, (size, size))
-                data = np.clip(data, -30, 30)
+                noise = _noise_scratch((size, size))
+                rng.standard_normal(out=noise)
+                noise *= 3
+                data = 15 * np.sin(lat_grid * 5) * np.cos(lon_grid * 5)
+                data += noise
+                data = np.clip(data, -30, 30, out=data)
             
             elif product == 'precipitation':
-                # Create precipitation rate pattern (0-50 mm/hr)
-                data = np.zeros((size, size))
-                for i in range(2):  # 2 precipitation areas
-                    center_lat = south + np.random.uniform(0.3, 0.7) * (north - south)
-                    center_lon = west + np.random.uniform(0.3, 0.7) * (east - west)
-                    
-                    dist = np.sqrt((lat_grid - center_lat)**2 + (lon_grid - center_lon)**2)
-                    precip_data = 10 * np.exp(-dist * 15) + np.random.exponential(2, (size, size))
-                    precip_data[precip_data > 50] = 50
-                    data = np.maximum(data, precip_data)
+                # Create precipitation rate pattern (0-50 mm/hr) from 2
+                # precipitation areas computed together
+                cells = 2
+                center_lat = south + rng.uniform(0.3, 0.7, cells) * (north - south)
+                center_lon = west + rng.uniform(0.3, 0.7, cells) * (east - west)
+                dist = np.sqrt(
+                    (lat_grid[None] - center_lat[:, None, None])**2 +
+                    (lon_grid[None] - center_lon[:, None, None])**2
+                )
+                noise = _noise_scratch(dist.shape)
+                rng.standard_exponential(out=noise)
+                noise *= 2
+                precip = np.exp(np.multiply(dist, -15, out=dist), out=dist)
+                precip *= 10
+                precip += noise
+                data = np.minimum(precip, 50, out=precip).max(axis=0)
             
             else:
                 # Default pattern
-                data = np.random.uniform(0, 20, (size, size))
+                data = rng.uniform(0, 20, (size, size))
             
             return {
                 'product': product,
                 'product_name': self.mrms_products.get(product, product),
                 'timestamp': datetime.now().isoformat(),
                 'bounds': bounds,
-                'latitude': lat_grid.tolist(),
-                'longitude': lon_grid.tolist(),
-                'data': data.tolist(),
-                'reflectivity': data.tolist() if product == 'reflectivity' else None,
+                # Grids stay as ndarrays; the views serialize them in one pass
+                'latitude': lat_grid,
+                'longitude': lon_grid,
+                'data': data,
                 'metadata': {
                     'resolution_km': 1.0,
                     'coverage': 'CONUS',
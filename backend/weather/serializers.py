@@ -1,8 +1,21 @@
+import orjson
 from rest_framework import serializers
-from .models import WeatherObservation, WeatherAlert, RadarSweep
+from .models import WeatherObservation, WeatherAlert, RadarSweep, decode_json_object
+
+
+class JSONTextField(serializers.JSONField):
+    """JSON object in the API, stored as encoded text on the model"""
+    
+    def to_internal_value(self, data):
+        return orjson.dumps(super().to_internal_value(data)).decode()
+    
+    def to_representation(self, value):
+        return decode_json_object(value)
 
 
 class WeatherObservationSerializer(serializers.ModelSerializer):
+    raw_data = JSONTextField(required=False)
+    
     class Meta:
         model = WeatherObservation
         fields = '__all__'
@@ -25,6 +38,8 @@ class RadarSweepSerializer(serializers.ModelSerializer):
 
 class WeatherObservationListSerializer(serializers.ModelSerializer):
     """Lighter serializer for list views"""
+    station_callsign = serializers.CharField(source='station.station_id', read_only=True)
+    
     class Meta:
         model = WeatherObservation
         fields = (
@@ -0,0 +1,21 @@
+"""
+Weather Tasks
+
+Periodic maintenance for weather data.
+"""
+
+import logging
+
+from celery import shared_task
+
+from .models import WeatherAlert
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def retire_expired_alerts():
+    """Mark expired alerts inactive so they drop out of the active-alert index"""
+    retired = WeatherAlert.objects.retire_expired()
+    if retired:
+        logger.info(f"Retired {retired} expired weather alerts")
@@ -14,4 +14,5 @@ urlpatterns = [
     path('radar-sites/', views.RadarSitesView.as_view(), name='radar-sites'),
     path('radar-data/<str:product_id>/', views.RadarDataView.as_view(), name='radar-data-product'),
     path('radar-overlay/<str:product_id>/', views.RadarOverlayView.as_view(), name='radar-overlay-product'),
+    path('radar-batch/', views.RadarBatchView.as_view(), name='radar-batch'),
 ]
@@ -1,46 +1,86 @@
 from django.shortcuts import render
+from django.http import HttpResponse
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.utils import timezone
 from datetime import datetime, timedelta
-from django.db.models import Q
-from .models import WeatherObservation, WeatherAlert, RadarSweep
+from django.db.models import Count, Q
+from .models import (
+    WeatherObservation, WeatherAlert, RadarSweep,
+    RadarSiteRegistry, RadarProductRegistry
+)
 from .serializers import (
     WeatherObservationSerializer, WeatherObservationListSerializer,
     WeatherAlertSerializer, RadarSweepSerializer
 )
 # Radar service imports
 from .radar_service import radar_service
-from django.views.decorators.cache import cache_page
+from django.views.decorators.cache import cache_control, cache_page
 from django.utils.decorators import method_decorator
 from rest_framework.views import APIView
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlencode
+from django.urls import reverse
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Let shared caches serve list/stats reads briefly, refreshing in the background
+shared_cache_control = cache_control(public=True, s_maxage=30, stale_while_revalidate=30)
+
+
+@lru_cache(maxsize=256)
+def _parse_since(value):
+    """Parse a ?since= ISO timestamp, or None if it is not one"""
+    # Polling clients repeat the same value; anything outside a plain date
+    # through a full offset timestamp is rejected without trying to parse
+    if not 10 <= len(value) <= 32:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _rendered_overlay_url(request, product_id, bounds, size):
+    """Absolute URL of the ?output=png overlay for these bounds and size"""
+    south, west, north, east = bounds
+    width, height = size
+    query = urlencode({
+        'south': south, 'west': west, 'north': north, 'east': east,
+        'width': width, 'height': height, 'output': 'png',
+    })
+    path = reverse('radar-overlay-product', args=[product_id])
+    return request.build_absolute_uri(f'{path}?{query}')
+
+
+@method_decorator(cache_page(30), name='dispatch')
+@method_decorator(shared_cache_control, name='get')
 class WeatherObservationListView(generics.ListCreateAPIView):
     """List all weather observations or create a new observation"""
-    queryset = WeatherObservation.objects.all()
+    queryset = WeatherObservation.objects.select_related('station')
     serializer_class = WeatherObservationListSerializer
     
     def get_queryset(self):
-        queryset = WeatherObservation.objects.all()
+        # Join the station up front and load only the columns the list serializer reads
+        queryset = WeatherObservation.objects.select_related('station').only(
+            'id', 'station__station_id', 'observation_time', 'temperature',
+            'humidity', 'pressure', 'wind_speed', 'wind_direction'
+        )
         
-        # Filter by station callsign
+        # Filter by station callsign prefix
         station = self.request.query_params.get('station', None)
         if station:
-            queryset = queryset.filter(station_callsign__icontains=station)
+            queryset = queryset.filter(station__station_id__istartswith=station.upper())
         
         # Filter by time range
         since = self.request.query_params.get('since', None)
-        if since:
-            try:
-                since_date = timezone.datetime.fromisoformat(since)
-                queryset = queryset.filter(observation_time__gte=since_date)
-            except ValueError:
-                pass
+        since_date = _parse_since(since) if since else None
+        if since_date:
+            queryset = queryset.filter(observation_time__gte=since_date)
         
         # Filter recent observations only
         recent_only = self.request.query_params.get('recent_only', 'false').lower() == 'true'
@@ -57,6 +97,8 @@ class WeatherObservationDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = WeatherObservationSerializer
 
 
+@method_decorator(cache_page(30), name='dispatch')
+@method_decorator(shared_cache_control, name='get')
 class WeatherAlertListView(generics.ListCreateAPIView):
     """List all weather alerts or create a new alert"""
     queryset = WeatherAlert.objects.all()
@@ -78,13 +120,9 @@ class WeatherAlertListView(generics.ListCreateAPIView):
         # Filter active alerts only
         active_only = self.request.query_params.get('active_only', 'false').lower() == 'true'
         if active_only:
-            now = timezone.now()
-            queryset = queryset.filter(
-                effective_time__lte=now,
-                expires_time__gte=now
-            )
+            queryset = queryset.current()
         
-        return queryset.order_by('-effective_time')
+        return queryset.order_by('-effective_at')
 
 
 class WeatherAlertDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -95,64 +133,64 @@ class WeatherAlertDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 class RadarDataListView(generics.ListCreateAPIView):
     """List all radar data or create new radar data"""
-    queryset = RadarSweep.objects.all()
+    queryset = RadarSweep.objects.select_related('site', 'product')
     serializer_class = RadarSweepSerializer
     
     def get_queryset(self):
-        queryset = RadarSweep.objects.all()
+        queryset = RadarSweep.objects.select_related('site', 'product')
         
         # Filter by site
         site = self.request.query_params.get('site', None)
         if site:
-            queryset = queryset.filter(site__site_id=site)
+            radar_site = RadarSiteRegistry.get(site)
+            queryset = queryset.filter(site=radar_site) if radar_site else queryset.none()
         
         # Filter by product type
         product = self.request.query_params.get('product', None)
         if product:
-            queryset = queryset.filter(product__code=product)
+            radar_product = RadarProductRegistry.get(product)
+            queryset = queryset.filter(product=radar_product) if radar_product else queryset.none()
         
         # Filter by time range
         since = self.request.query_params.get('since', None)
-        if since:
-            try:
-                since_date = timezone.datetime.fromisoformat(since)
-                queryset = queryset.filter(scan_time__gte=since_date)
-            except ValueError:
-                pass
+        since_date = _parse_since(since) if since else None
+        if since_date:
+            queryset = queryset.filter(sweep_time__gte=since_date)
         
-        return queryset.order_by('-scan_time')
+        return queryset.order_by('-sweep_time')
 
 
 class RadarDataDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete radar data"""
-    queryset = RadarSweep.objects.all()
+    queryset = RadarSweep.objects.select_related('site', 'product')
     serializer_class = RadarSweepSerializer
 
 
+@cache_page(30)
+@shared_cache_control
 @api_view(['GET'])
 def weather_stats(request):
     """Get weather statistics"""
-    total_observations = WeatherObservation.objects.count()
-    active_alerts = WeatherAlert.objects.filter(
-        effective_time__lte=timezone.now(),
-        expires_time__gte=timezone.now()
-    ).count()
+    # One cutoff for every count and the reported timestamp
+    now = timezone.now()
+    last_24h = now - timedelta(hours=24)
     
-    # Get recent observations (last 24 hours)
-    last_24h = timezone.now() - timedelta(hours=24)
-    recent_observations = WeatherObservation.objects.filter(
-        observation_time__gte=last_24h
-    ).count()
+    # Total and recent (last 24 hours) observations in a single pass
+    observation_counts = WeatherObservation.objects.aggregate(
+        total=Count('id'),
+        recent=Count('id', filter=Q(observation_time__gte=last_24h))
+    )
+    active_alerts = WeatherAlert.objects.current(now).count()
     
     # Get radar data count
     radar_count = RadarSweep.objects.count()
     
     return Response({
-        'total_observations': total_observations,
-        'recent_observations': recent_observations,
+        'total_observations': observation_counts['total'],
+        'recent_observations': observation_counts['recent'],
         'active_alerts': active_alerts,
         'radar_data_count': radar_count,
-        'timestamp': timezone.now().isoformat()
+        'timestamp': now.isoformat()
     })
 
 
@@ -242,6 +280,11 @@ class RadarOverlayView(APIView):
             height = int(request.GET.get('height', 512))
             size = (width, height)
             
+            # ?output=png serves the rendered overlay itself rather than JSON
+            # (DRF reserves ?format= for renderer selection)
+            if request.GET.get('output') == 'png':
+                return self._png_response(product_id, bounds, size)
+            
             logger.info(f"Generating NOAA WMS overlay for product: {product_id}")
             
             # Get NOAA WMS URL directly
@@ -260,7 +303,8 @@ class RadarOverlayView(APIView):
                     'wms_service': 'mapservices.weather.noaa.gov'
                 })
             else:
-                # Fall back to generating overlay from mock data
+                # Fall back to an overlay rendered from our own data; the image is
+                # served as image/png from ?output=png rather than inlined here
                 radar_data = radar_service.get_latest_radar_data(product_id, bounds)
                 
                 if not radar_data:
@@ -269,25 +313,16 @@ class RadarOverlayView(APIView):
                         'message': f'No MRMS data available for {product_id}'
                     }, status=status.HTTP_404_NOT_FOUND)
                 
-                # Generate overlay
-                overlay_image = radar_service.generate_radar_overlay(radar_data, bounds, size)
-                
-                if overlay_image:
-                    return Response({
-                        'success': True,
-                        'product_id': product_id,
-                        'timestamp': radar_data['timestamp'],
-                        'bounds': bounds,
-                        'size': size,
-                        'image_data': overlay_image,
-                        'format': 'png',
-                        'encoding': 'base64'
-                    })
-                else:
-                    return Response({
-                        'success': False,
-                        'message': 'Failed to generate MRMS overlay'
-                    }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                return Response({
+                    'success': True,
+                    'product_id': product_id,
+                    'timestamp': radar_data['timestamp'],
+                    'bounds': bounds,
+                    'size': size,
+                    'overlay_url': _rendered_overlay_url(request, product_id, bounds, size),
+                    'format': 'png',
+                    'source': 'APRSwx'
+                })
                 
         except Exception as e:
             logger.error(f"Error generating MRMS overlay for {product_id}: {e}")
@@ -295,3 +330,117 @@ class RadarOverlayView(APIView):
                 {'error': f'Failed to generate MRMS overlay: {str(e)}'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+    
+    def _png_response(self, product_id, bounds, size):
+        """Rendered overlay as image/png with an ETag for conditional requests"""
+        radar_data = radar_service.get_latest_radar_data(product_id, bounds)
+        if not radar_data:
+            return Response({
+                'success': False,
+                'message': f'No MRMS data available for {product_id}'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        png_bytes = radar_service.render_overlay_png(radar_data, bounds, size)
+        if png_bytes is None:
+            return Response({
+                'success': False,
+                'message': 'Failed to generate MRMS overlay'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        response = HttpResponse(png_bytes, content_type='image/png')
+        response['Cache-Control'] = 'public, max-age=60'
+        response['ETag'] = f'"{radar_service.overlay_digest(radar_data, bounds, size)}"'
+        return response
+
+
+class RadarBatchView(APIView):
+    """Fetch MRMS radar data and overlays for several products in one request"""
+    
+    max_products = 20
+    
+    def post(self, request):
+        try:
+            product_ids = request.data.get('product_ids') or request.data.get('site_ids') or []
+            if not isinstance(product_ids, list) or not product_ids:
+                return Response(
+                    {'error': 'product_ids must be a non-empty list'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if len(product_ids) > self.max_products:
+                return Response(
+                    {'error': f'At most {self.max_products} products per batch'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            bounds = request.data.get('bounds') or [25.0, -125.0, 50.0, -65.0]
+            bounds = [float(value) for value in bounds]
+            width, height = request.data.get('size') or (512, 512)
+            size = (int(width), int(height))
+            
+            logger.info(f"Fetching MRMS batch for products: {product_ids}")
+            
+            # Products are independent, so fetch them side by side
+            product_ids = list(dict.fromkeys(str(product_id) for product_id in product_ids))
+            with ThreadPoolExecutor(max_workers=min(8, len(product_ids))) as executor:
+                results = executor.map(
+                    lambda product_id: self._fetch_product(request, product_id, bounds, size),
+                    product_ids
+                )
+                payload = dict(zip(product_ids, results))
+            
+            return Response({
+                'success': True,
+                'bounds': bounds,
+                'size': size,
+                'results': payload
+            })
+            
+        except (TypeError, ValueError) as e:
+            return Response(
+                {'error': f'Invalid batch parameters: {str(e)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            logger.error(f"Error fetching MRMS batch: {e}")
+            return Response(
+                {'error': f'Failed to fetch MRMS batch: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    
+    def _fetch_product(self, request, product_id, bounds, size):
+        """Radar data plus overlay for one product, mirroring the single-product views"""
+        try:
+            radar_data = radar_service.get_latest_radar_data(product_id, bounds)
+            if not radar_data:
+                return {
+                    'success': False,
+                    'message': f'No MRMS data available for {product_id}'
+                }
+            
+            result = {
+                'success': True,
+                'product_name': radar_data.get('product_name', product_id),
+                'data': radar_data
+            }
+            
+            overlay_url = radar_service._get_mrms_overlay_url(product_id, bounds)
+            if overlay_url:
+                result['overlay'] = {
+                    'overlay_url': overlay_url,
+                    'format': 'png',
+                    'source': 'NOAA WMS'
+                }
+            else:
+                result['overlay'] = {
+                    'overlay_url': _rendered_overlay_url(request, product_id, bounds, size),
+                    'format': 'png',
+                    'source': 'APRSwx'
+                }
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error fetching MRMS batch entry for {product_id}: {e}")
+            return {
+                'success': False,
+                'message': str(e)
+            }
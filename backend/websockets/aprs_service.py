@@ -2,67 +2,79 @@
 APRS-IS Connection Service
 Handles background connection to APRS-IS when requested by WebSocket
 """
-import threading
-import socket
+import asyncio
+import hashlib
 import json
 import logging
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 from datetime import datetime
 from django.utils import timezone
 from django.conf import settings
+from channels.db import database_sync_to_async
 from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-from packets.models import APRSPacket
-from stations.models import Station
+from asgiref.sync import sync_to_async
+from packets.tasks import persist_aprs_packets
 from weather.models import WeatherObservation
 
 logger = logging.getLogger(__name__)
 
+# Received packets are stored in batches of up to this many lines, flushed
+# at least this often
+PACKET_BATCH_SIZE = 500
+PACKET_FLUSH_INTERVAL = 0.5  # seconds
+
+# Stream buffer for APRS-IS reads; reading pauses only once twice this much
+# unread data has piled up, so bursts wait in user space during flushes
+STREAM_BUFFER_LIMIT = 1 << 20
+
+# Packet batches are handed to their own threads, so ingest never queues
+# behind consumer database work on the shared executors
+APRSIS_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='aprsis')
+
 
 class APRSISConnectionService:
     """Service to handle APRS-IS connections"""
     
     def __init__(self):
-        self.connection_thread = None
+        self.connection_task = None
         self.is_connected = False
-        self.should_disconnect = False
         self.current_settings = None
-        self.socket = None
+        self.writer = None
+        self.packet_buffer = deque()
+        self.flush_task = None
         
-    def connect(self, user_settings):
+    async def connect(self, user_settings):
         """Start APRS-IS connection with user settings"""
-        if self.is_connected:
+        if self.is_connected or (self.connection_task and not self.connection_task.done()):
             logger.info("APRS-IS already connected")
             return
             
         self.current_settings = user_settings
-        self.should_disconnect = False
         
-        # Start connection in background thread
-        self.connection_thread = threading.Thread(
-            target=self._connection_worker,
-            daemon=True
-        )
-        self.connection_thread.start()
+        # Run the connection as a task on the calling event loop
+        self.connection_task = asyncio.create_task(self._connection_worker())
         
-    def disconnect(self):
+    async def disconnect(self):
         """Disconnect from APRS-IS"""
         logger.info("Disconnecting from APRS-IS")
-        self.should_disconnect = True
         
-        if self.socket:
+        task = self.connection_task
+        if task and not task.done():
+            task.cancel()
             try:
-                self.socket.close()
-            except:
+                await asyncio.wait_for(task, timeout=5)
+            except (asyncio.CancelledError, asyncio.TimeoutError):
                 pass
-        
-        if self.connection_thread and self.connection_thread.is_alive():
-            self.connection_thread.join(timeout=5)
             
+        self.connection_task = None
         self.is_connected = False
         self.current_settings = None
         
-    def _connection_worker(self):
-        """Background worker for APRS-IS connection"""
+    async def _connection_worker(self):
+        """Background task for APRS-IS connection"""
         try:
             # APRS-IS server configuration
             server = getattr(settings, 'APRSIS_SERVER', 'rotate.aprs.net')
@@ -76,7 +88,7 @@ class APRSISConnectionService:
             # Validate callsign and passcode
             if not callsign or callsign.upper() == 'NOCALL' or not isinstance(passcode, int) or passcode <= 0:
                 logger.error(f"Invalid callsign or passcode for APRS-IS: callsign={callsign}, passcode={passcode}")
-                self._broadcast_connection_status(False, "Invalid callsign or passcode. Please set your real callsign and passcode in User Settings.")
+                await self._broadcast_connection_status(False, "Invalid callsign or passcode. Please set your real callsign and passcode in User Settings.")
                 return
             # Build filter string
             filter_str = self._build_filter_string(location, filters)
@@ -84,9 +96,9 @@ class APRSISConnectionService:
             logger.info(f"Connecting to APRS-IS: {server}:{port} with callsign {callsign}")
             
             # Connect to APRS-IS
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(30)
-            self.socket.connect((server, port))
+            reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(server, port, limit=STREAM_BUFFER_LIMIT), timeout=30
+            )
             
             # Send login
             login_string = f"user {callsign} pass {passcode} vers APRSwx 1.0"
@@ -94,7 +106,8 @@ class APRSISConnectionService:
                 login_string += f" filter {filter_str}"
             login_string += "\r\n"
             
-            self.socket.send(login_string.encode())
+            self.writer.write(login_string.encode())
+            await self.writer.drain()
             
             # Read server responses (there might be multiple lines)
             login_successful = False
@@ -103,8 +116,7 @@ class APRSISConnectionService:
             # Read initial responses
             for _ in range(5):  # Try to read up to 5 lines
                 try:
-                    self.socket.settimeout(3)
-                    response = self.socket.recv(1024).decode()
+                    response = (await asyncio.wait_for(reader.readline(), timeout=3)).decode()
                     response_lines.append(response.strip())
                     logger.info(f"APRS-IS server response: {response.strip()}")
                     
@@ -117,7 +129,7 @@ class APRSISConnectionService:
                         break
                     elif response.strip() == "":
                         break
-                except socket.timeout:
+                except asyncio.TimeoutError:
                     break
                 except Exception as e:
                     logger.warning(f"Error reading response: {e}")
@@ -133,136 +145,83 @@ class APRSISConnectionService:
                 logger.info("Successfully connected to APRS-IS")
                 
                 # Notify frontend of successful connection
-                self._broadcast_connection_status(True)
+                await self._broadcast_connection_status(True)
                 
                 # Start receiving packets
-                self._packet_loop()
+                self.flush_task = asyncio.create_task(self._flush_loop())
+                await self._packet_loop(reader)
             else:
                 logger.error(f"APRS-IS login failed: {' | '.join(response_lines)}")
-                self._broadcast_connection_status(False, f"Login failed: {' | '.join(response_lines)}")
+                await self._broadcast_connection_status(False, f"Login failed: {' | '.join(response_lines)}")
                 
+        except asyncio.CancelledError:
+            logger.info("APRS-IS connection cancelled")
+            raise
         except Exception as e:
             logger.error(f"APRS-IS connection error: {e}")
-            self._broadcast_connection_status(False, str(e))
+            await self._broadcast_connection_status(False, str(e))
         finally:
             self.is_connected = False
-            if self.socket:
-                self.socket.close()
+            if self.flush_task:
+                self.flush_task.cancel()
+                self.flush_task = None
+            # Store whatever arrived since the last flush
+            await self._flush_packets()
+            if self.writer:
+                self.writer.close()
+                self.writer = None
                 
-    def _packet_loop(self):
-        """Main packet receiving loop"""
-        buffer = ""
-        
-        while not self.should_disconnect:
+    async def _packet_loop(self, reader):
+        """Main packet receiving loop; ends on EOF or when the task is cancelled"""
+        while True:
             try:
-                # Set socket timeout for periodic checks
-                self.socket.settimeout(1.0)
-                
-                try:
-                    data = self.socket.recv(1024).decode('utf-8', errors='ignore')
-                    if not data:
-                        break
-                except socket.timeout:
-                    continue
-                    
-                buffer += data
-                
-                # Process complete lines
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    line = line.strip()
+                # APRS-IS is line-delimited, so each read is one packet
+                data = await reader.readline()
+                if not data:
+                    break
                     
-                    if line and not line.startswith('#'):
-                        self._process_packet(line)
+                line = data.decode('utf-8', errors='ignore').strip()
+                if line and not line.startswith('#'):
+                    self.packet_buffer.append(line)
+                    if len(self.packet_buffer) >= PACKET_BATCH_SIZE:
+                        await self._flush_packets()
                         
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in packet loop: {e}")
                 break
                 
         logger.info("APRS-IS packet loop ended")
         
-    def _process_packet(self, raw_packet):
-        """Process a received APRS packet"""
-        try:
-            from packets.management.commands.aprs_listener import APRSParser
-            
-            # Parse the packet
-            parsed = APRSParser.parse_packet(raw_packet)
+    async def _flush_loop(self):
+        """Periodically store buffered packets so quiet feeds are not delayed"""
+        while True:
+            await asyncio.sleep(PACKET_FLUSH_INTERVAL)
+            await self._flush_packets()
             
-            if 'error' in parsed:
-                logger.warning(f"Failed to parse packet: {parsed['error']}")
-                return
-                
-            # Save packet to database
-            packet = APRSPacket.objects.create(
-                source_callsign=parsed['source_callsign'],
-                packet_type=parsed['packet_type'],
-                timestamp=timezone.now(),
-                raw_packet=raw_packet,
-                parsed_data=parsed
-            )
-            
-            # Broadcast packet via WebSocket
-            channel_layer = get_channel_layer()
-            if channel_layer:
-                async_to_sync(channel_layer.group_send)(
-                    'aprs_packets',
-                    {
-                        'type': 'packet_update',
-                        'packet': {
-                            'id': packet.id,
-                            'source_callsign': packet.source_callsign,
-                            'packet_type': packet.packet_type,
-                            'timestamp': packet.timestamp.isoformat(),
-                            'raw_packet': packet.raw_packet,
-                            'parsed_data': packet.parsed_data,
-                        }
-                    }
-                )
-            
-            # Update station if position packet
-            if parsed['packet_type'] == 'position' and 'latitude' in parsed and 'longitude' in parsed:
-                station, created = Station.objects.update_or_create(
-                    callsign=parsed['source_callsign'],
-                    defaults={
-                        'latitude': parsed['latitude'],
-                        'longitude': parsed['longitude'],
-                        'symbol_table': parsed.get('symbol_table', '/'),
-                        'symbol_code': parsed.get('symbol_code', '/'),
-                        'last_heard': timezone.now(),
-                        'last_comment': parsed.get('comment', ''),
-                        'station_type': 'mobile' if parsed.get('symbol_code') == '>' else 'fixed',
-                        'is_active': True
-                    }
-                )
-                
-                # Broadcast station update
-                if channel_layer:
-                    async_to_sync(channel_layer.group_send)(
-                        'stations',
-                        {
-                            'type': 'station_update',
-                            'station': {
-                                'id': station.id,
-                                'callsign': station.callsign,
-                                'latitude': station.latitude,
-                                'longitude': station.longitude,
-                                'symbol_table': station.symbol_table,
-                                'symbol_code': station.symbol_code,
-                                'last_heard': station.last_heard.isoformat(),
-                                'last_comment': station.last_comment,
-                                'station_type': station.station_type,
-                                'emoji_symbol': station.emoji_symbol,
-                            }
-                        }
-                    )
-            
-            logger.debug(f"Processed packet from {parsed['source_callsign']}")
+    async def _flush_packets(self):
+        """Hand buffered APRS packets off for parsing and storage"""
+        if not self.packet_buffer:
+            return
+        batch = list(self.packet_buffer)
+        self.packet_buffer.clear()
+        try:
+            if getattr(settings, 'APRSIS_CELERY_INGEST', False):
+                # Publishing talks to the broker, so keep it off the event loop
+                await sync_to_async(
+                    persist_aprs_packets.delay, thread_sensitive=False, executor=APRSIS_EXECUTOR
+                )(batch)
+            else:
+                await database_sync_to_async(
+                    persist_aprs_packets, thread_sensitive=False, executor=APRSIS_EXECUTOR
+                )(batch)
             
         except Exception as e:
-            logger.error(f"Error processing packet: {e}")
+            logger.error(f"Error processing {len(batch)} packets: {e}")
             
-    def _build_filter_string(self, location, filters):
+    @staticmethod
+    def _build_filter_string(location, filters):
         """Build APRS-IS filter string from user settings"""
         filter_parts = []
         
@@ -275,20 +234,162 @@ class APRSISConnectionService:
         # Add other filters as needed
         return ' '.join(filter_parts)
         
-    def _broadcast_connection_status(self, connected, error=None):
+    async def _broadcast_connection_status(self, connected, error=None):
         """Broadcast connection status to WebSocket clients"""
         channel_layer = get_channel_layer()
         if channel_layer:
-            async_to_sync(channel_layer.group_send)(
+            # Encoded once here; consumers forward the frame as-is
+            frame = orjson.dumps({
+                'type': 'aprsis_status',
+                'connected': connected,
+                'error': error,
+                'timestamp': timezone.now()
+            }).decode()
+            await channel_layer.group_send(
                 'aprs_packets',
                 {
                     'type': 'connection_status',
-                    'connected': connected,
-                    'error': error,
-                    'timestamp': timezone.now().isoformat()
+                    'frame': frame
                 }
             )
 
 
-# Global service instance
-aprs_service = APRSISConnectionService()
+class APRSServiceRegistry:
+    """
+    Shared APRS-IS connections, one per server, filter and login
+    
+    Consumers asking for the same filter with the same callsign and passcode
+    reuse one connection, which is closed when the last of them releases it.
+    """
+    
+    def __init__(self):
+        self.services = {}
+        self.ref_counts = {}
+        self._lock = asyncio.Lock()
+        
+    @staticmethod
+    def connection_key(user_settings):
+        """Key identifying the APRS-IS feed and login these settings ask for"""
+        server = getattr(settings, 'APRSIS_SERVER', 'rotate.aprs.net')
+        filter_str = APRSISConnectionService._build_filter_string(
+            user_settings.get('location'), user_settings.get('aprsIsFilters', {})
+        )
+        # Each login gets its own connection, so one user's traffic never goes
+        # out under another's callsign; hashed to keep the passcode out of keys
+        login = f"{user_settings.get('callsign')}:{user_settings.get('passcode')}"
+        login_hash = hashlib.sha256(login.encode()).hexdigest()[:16]
+        return (server, filter_str, login_hash)
+        
+    async def acquire(self, user_settings):
+        """Join (or open) the connection for these settings; returns its key"""
+        key = self.connection_key(user_settings)
+        async with self._lock:
+            service = self.services.get(key)
+            if service is None:
+                service = self.services[key] = APRSISConnectionService()
+            self.ref_counts[key] = self.ref_counts.get(key, 0) + 1
+            
+            # No-op while connected; restarts a connection that has dropped
+            await service.connect(user_settings)
+        return key
+        
+    async def release(self, key):
+        """Leave a connection, closing it once nobody is using it"""
+        async with self._lock:
+            count = self.ref_counts.get(key, 0) - 1
+            if count > 0:
+                self.ref_counts[key] = count
+                return
+            self.ref_counts.pop(key, None)
+            service = self.services.pop(key, None)
+            
+        if service:
+            await service.disconnect()
+            
+    async def close_all(self):
+        """Close every connection regardless of who holds it"""
+        async with self._lock:
+            services = list(self.services.values())
+            self.services.clear()
+            self.ref_counts.clear()
+            
+        for service in services:
+            await service.disconnect()
+
+
+# Channel the aprsis_worker command receives on. Requests go to this one
+# channel rather than a group, so exactly one worker process is supported:
+# a second worker would take a share of the requests, not duplicate them.
+APRSIS_WORKER_CHANNEL = 'aprsis-worker'
+
+# Web processes holding connections renew their lease this often; the worker
+# releases everything a process held once its lease has not been renewed for
+# APRSIS_LEASE_TIMEOUT, e.g. after the process died without releasing
+APRSIS_HEARTBEAT_INTERVAL = 30  # seconds
+APRSIS_LEASE_TIMEOUT = 120  # seconds
+
+
+class APRSWorkerClient:
+    """
+    Registry stand-in for web processes when connections run elsewhere
+    
+    Forwards acquire/release over the channel layer to the aprsis_worker
+    management command, which owns the sockets. Requests carry an ID for
+    this process, and a heartbeat renews its lease while it holds any.
+    """
+    
+    def __init__(self):
+        self.holder = uuid.uuid4().hex
+        self.held = 0
+        self._heartbeat = None
+    
+    async def _send(self, message):
+        message['holder'] = self.holder
+        await get_channel_layer().send(APRSIS_WORKER_CHANNEL, message)
+    
+    def _ensure_heartbeat(self):
+        """Start the lease heartbeat on the running loop if it is not already running"""
+        task = self._heartbeat
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+    
+    async def _heartbeat_loop(self):
+        """Renew this process's lease until it holds no connections"""
+        while True:
+            await asyncio.sleep(APRSIS_HEARTBEAT_INTERVAL)
+            if not self.held:
+                return
+            try:
+                await self._send({'type': 'aprsis.heartbeat'})
+            except Exception as e:
+                logger.error(f"Error renewing APRS-IS worker lease: {e}")
+    
+    async def acquire(self, user_settings):
+        await self._send({
+            'type': 'aprsis.acquire',
+            'user_settings': user_settings,
+        })
+        self.held += 1
+        self._ensure_heartbeat()
+        return APRSServiceRegistry.connection_key(user_settings)
+        
+    async def release(self, key):
+        self.held = max(self.held - 1, 0)
+        await self._send({
+            'type': 'aprsis.release',
+            'key': list(key),
+        })
+
+
+# Global registry of shared connections
+aprs_services = APRSServiceRegistry()
+
+# This process's client for the aprsis_worker command, holding its lease
+aprs_worker_client = APRSWorkerClient()
+
+
+def get_aprs_services():
+    """The registry consumers should use: local, or the separate worker process"""
+    if getattr(settings, 'APRSIS_WORKER_PROCESS', False):
+        return aprs_worker_client
+    return aprs_services
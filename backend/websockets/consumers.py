@@ -2,18 +2,100 @@
 WebSocket consumers for real-time APRS data streaming
 """
 
-import json
+import asyncio
 import logging
+import time
+import orjson
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.utils import timezone
-from .models import WebSocketConnection, Subscription
+from .models import ACTIVITY_FLUSH_INTERVAL, WebSocketConnection, Subscription, ConnectionStats
 from packets.models import APRSPacket
 from stations.models import Station
 from weather.models import WeatherObservation, RadarSweep, WeatherAlert
 
 logger = logging.getLogger('aprs')
 
+# Frame timestamp shared by every message sent within the same short tick
+TIMESTAMP_TICK = 0.05  # seconds
+_timestamp_cache = {'expires': 0.0, 'value': None, 'encoded': None}
+
+
+def _now():
+    """Current time, reused for TIMESTAMP_TICK seconds across frames"""
+    tick = time.monotonic()
+    if tick >= _timestamp_cache['expires']:
+        _timestamp_cache['value'] = timezone.now()
+        _timestamp_cache['encoded'] = None
+        _timestamp_cache['expires'] = tick + TIMESTAMP_TICK
+    return _timestamp_cache['value']
+
+
+def _now_json():
+    """_now() as a JSON string literal, encoded once per tick"""
+    value = _now()
+    if _timestamp_cache['encoded'] is None:
+        _timestamp_cache['encoded'] = _json(value)
+    return _timestamp_cache['encoded']
+
+
+def _json(value):
+    """Encode one value as JSON text"""
+    return orjson.dumps(value).decode()
+
+
+# Fixed-shape replies, filled in with JSON-encoded values instead of
+# running the encoder over a whole message dict
+ERROR_FRAME = '{"type":"error","message":%s,"timestamp":%s}'
+PONG_FRAME = '{"type":"pong","timestamp":%s}'
+SUBSCRIBED_FRAME = '{"type":"subscribed","subscription_type":%s,"filters":%s}'
+UNSUBSCRIBED_FRAME = '{"type":"unsubscribed","subscription_type":%s}'
+FILTER_UPDATED_FRAME = '{"type":"filter_updated","filters":%s}'
+APRSIS_CONNECTING_FRAME = '{"type":"aprsis_connecting","message":"Connecting to APRS-IS...","timestamp":%s}'
+APRSIS_DISCONNECTED_FRAME = '{"type":"aprsis_disconnected","message":"Disconnected from APRS-IS","timestamp":%s}'
+MESSAGE_SENT_FRAME = '{"type":"message_sent","message_id":%s,"status":"sent","timestamp":%s}'
+
+
+def database_read_to_async(func):
+    """
+    database_sync_to_async for read-only queries
+    
+    Runs off the shared thread-sensitive executor, so snapshot reads for
+    different connections proceed in parallel; writes keep the default.
+    """
+    return database_sync_to_async(func, thread_sensitive=False)
+
+
+# Initial snapshot frames are shared by connects to the same group until a
+# broadcast changes the data or this many seconds pass
+INITIAL_DATA_TTL = 2.0  # seconds
+_initial_frames = {}
+
+
+# Background task writing in-memory last-seen times for this process
+_activity_flush = {'task': None}
+
+
+async def _flush_activity_loop():
+    """Write recorded connection activity every ACTIVITY_FLUSH_INTERVAL"""
+    while True:
+        await asyncio.sleep(ACTIVITY_FLUSH_INTERVAL)
+        try:
+            await database_sync_to_async(WebSocketConnection.flush_activity)()
+        except Exception as e:
+            logger.error(f"Error writing connection activity: {e}")
+
+
+def _ensure_activity_flush():
+    """Start the activity flush task on the running loop if it is not already running"""
+    task = _activity_flush['task']
+    if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+        _activity_flush['task'] = asyncio.create_task(_flush_activity_loop())
+
+
+# Heartbeat exactly as the web client sends it, answered without parsing
+PING_MESSAGE = '{"type":"ping"}'
+
 
 class BaseAPRSConsumer(AsyncWebsocketConsumer):
     """Base consumer with common functionality"""
@@ -23,19 +105,38 @@ class BaseAPRSConsumer(AsyncWebsocketConsumer):
         self.connection_record = None
         self.group_name = None
         self.user = None
+        self._client_ip = None
+        self._user_agent = None
+        # Traffic counters, written to the database once on disconnect
+        self.messages_sent = 0
+        self.messages_received = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.message_errors = 0
+        self.message_handlers = {
+            'subscribe': self.handle_subscribe,
+            'unsubscribe': self.handle_unsubscribe,
+            'filter': self.handle_filter,
+            'ping': self.handle_ping,
+        }
     
     async def connect(self):
         """Handle WebSocket connection"""
         await self.accept()
         
-        # Create connection record
-        self.connection_record = await self.create_connection_record()
-        
-        # Join group for broadcasting
+        # Create the connection record and join the broadcast group together,
+        # so the channel layer round trip overlaps the database write
         if self.group_name:
-            await self.channel_layer.group_add(self.group_name, self.channel_name)
+            self.connection_record, _ = await asyncio.gather(
+                self.create_connection_record(),
+                self.channel_layer.group_add(self.group_name, self.channel_name)
+            )
+        else:
+            self.connection_record = await self.create_connection_record()
         
         logger.info(f"WebSocket connected: {self.connection_record.connection_id}")
+        WebSocketConnection.mark_open(self.connection_record.pk)
+        _ensure_activity_flush()
         
         # Send initial data
         await self.send_initial_data()
@@ -52,41 +153,65 @@ class BaseAPRSConsumer(AsyncWebsocketConsumer):
     
     async def receive(self, text_data):
         """Handle incoming WebSocket messages"""
+        self.messages_received += 1
+        self.bytes_received += len(text_data or '')
+        if self.connection_record:
+            # Presence is recorded in memory; the flush task writes it in bulk
+            WebSocketConnection.mark_seen(self.connection_record.pk)
+        if text_data == PING_MESSAGE:
+            await self.send_pong()
+            return
         try:
-            data = json.loads(text_data)
-            message_type = data.get('type')
-            
-            if message_type == 'subscribe':
-                await self.handle_subscribe(data)
-            elif message_type == 'unsubscribe':
-                await self.handle_unsubscribe(data)
-            elif message_type == 'filter':
-                await self.handle_filter(data)
-            elif message_type == 'ping':
-                await self.send_pong()
-            else:
-                await self.handle_custom_message(data)
+            data = orjson.loads(text_data)
+            handler = self.message_handlers.get(data.get('type'), self.handle_custom_message)
+            await handler(data)
                 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             await self.send_error("Invalid JSON format")
         except Exception as e:
             logger.error(f"Error handling message: {e}")
             await self.send_error("Internal server error")
     
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        """Send a frame, counting it toward this connection's stats"""
+        if text_data is not None:
+            self.messages_sent += 1
+            self.bytes_sent += len(text_data)
+        elif bytes_data is not None:
+            self.messages_sent += 1
+            self.bytes_sent += len(bytes_data)
+        await super().send(text_data=text_data, bytes_data=bytes_data, close=close)
+    
+    async def send_json(self, content):
+        """Send a JSON text frame, encoded with orjson (datetimes included)"""
+        await self.send(text_data=orjson.dumps(content).decode())
+    
+    async def send_prerendered(self, event):
+        """
+        Forward a frame the producer already encoded
+        
+        Broadcasts may carry the finished JSON text under 'frame' so it is
+        encoded once per group_send instead of once per subscriber. Returns
+        False when there is none and the handler should build the frame.
+        """
+        frame = event.get('frame')
+        if frame is None:
+            return False
+        await self.send(text_data=frame)
+        return True
+    
     async def send_error(self, message):
         """Send error message to client"""
-        await self.send(text_data=json.dumps({
-            'type': 'error',
-            'message': message,
-            'timestamp': timezone.now().isoformat()
-        }))
+        self.message_errors += 1
+        await self.send(text_data=ERROR_FRAME % (_json(message), _now_json()))
     
     async def send_pong(self):
         """Send pong response"""
-        await self.send(text_data=json.dumps({
-            'type': 'pong',
-            'timestamp': timezone.now().isoformat()
-        }))
+        await self.send(text_data=PONG_FRAME % _now_json())
+    
+    async def handle_ping(self, data):
+        """Handle heartbeat pings"""
+        await self.send_pong()
     
     async def handle_subscribe(self, data):
         """Handle subscription requests"""
@@ -95,11 +220,7 @@ class BaseAPRSConsumer(AsyncWebsocketConsumer):
         
         if subscription_type:
             await self.create_subscription(subscription_type, filters)
-            await self.send(text_data=json.dumps({
-                'type': 'subscribed',
-                'subscription_type': subscription_type,
-                'filters': filters
-            }))
+            await self.send(text_data=SUBSCRIBED_FRAME % (_json(subscription_type), _json(filters)))
     
     async def handle_unsubscribe(self, data):
         """Handle unsubscription requests"""
@@ -107,27 +228,57 @@ class BaseAPRSConsumer(AsyncWebsocketConsumer):
         
         if subscription_type:
             await self.remove_subscription(subscription_type)
-            await self.send(text_data=json.dumps({
-                'type': 'unsubscribed',
-                'subscription_type': subscription_type
-            }))
+            await self.send(text_data=UNSUBSCRIBED_FRAME % _json(subscription_type))
     
     async def handle_filter(self, data):
         """Handle filter updates"""
         filters = data.get('filters', {})
         await self.update_filters(filters)
-        await self.send(text_data=json.dumps({
-            'type': 'filter_updated',
-            'filters': filters
-        }))
+        await self.send(text_data=FILTER_UPDATED_FRAME % _json(filters))
     
     async def handle_custom_message(self, data):
         """Handle custom messages (override in subclasses)"""
         pass
     
     async def send_initial_data(self):
-        """Send initial data to client (override in subclasses)"""
-        pass
+        """
+        Send the group's initial snapshot to the client
+        
+        The encoded frame is cached per group, so a burst of connects costs
+        one set of queries and one encode; concurrent connects wait on the
+        same build.
+        """
+        entry = _initial_frames.get(self.group_name)
+        if entry is None or entry[0] <= time.monotonic():
+            entry = (time.monotonic() + INITIAL_DATA_TTL, asyncio.ensure_future(self.build_initial_frame()))
+            _initial_frames[self.group_name] = entry
+        frame = entry[1]
+        if not isinstance(frame, str):
+            try:
+                frame = await asyncio.shield(frame)
+            except Exception:
+                if _initial_frames.get(self.group_name) is entry:
+                    del _initial_frames[self.group_name]
+                raise
+            if _initial_frames.get(self.group_name) is entry:
+                _initial_frames[self.group_name] = (entry[0], frame)
+        if frame is not None:
+            await self.send(text_data=frame)
+    
+    async def build_initial_frame(self):
+        """Encode the initial snapshot message, or None when there is none"""
+        message = await self.get_initial_data()
+        if message is None:
+            return None
+        return orjson.dumps(message).decode()
+    
+    async def get_initial_data(self):
+        """Initial snapshot message for new clients (override in subclasses)"""
+        return None
+    
+    def invalidate_initial_data(self):
+        """Drop the cached snapshot after a broadcast changed its data"""
+        _initial_frames.pop(self.group_name, None)
     
     @database_sync_to_async
     def create_connection_record(self):
@@ -146,22 +297,36 @@ class BaseAPRSConsumer(AsyncWebsocketConsumer):
     
     @database_sync_to_async
     def disconnect_connection_record(self):
-        """Mark connection as disconnected"""
+        """Mark connection as disconnected and record its traffic"""
         if self.connection_record:
-            self.connection_record.disconnect()
+            record = self.connection_record
+            record.messages_sent = self.messages_sent
+            record.messages_received = self.messages_received
+            record.disconnect()
+            ConnectionStats.record_session(
+                record,
+                messages_sent=self.messages_sent,
+                messages_received=self.messages_received,
+                bytes_sent=self.bytes_sent,
+                bytes_received=self.bytes_received,
+                message_errors=self.message_errors
+            )
     
     @database_sync_to_async
     def create_subscription(self, subscription_type, filters):
-        """Create subscription record"""
+        """Create subscription record, or replace its filters, in one statement"""
         if self.connection_record:
-            subscription, created = Subscription.objects.get_or_create(
+            subscription = Subscription(
                 connection=self.connection_record,
                 subscription_type=subscription_type,
-                defaults={'filters': filters}
+                filters=filters
+            )
+            Subscription.objects.bulk_create(
+                [subscription],
+                update_conflicts=True,
+                unique_fields=['connection', 'subscription_type'],
+                update_fields=['filters', 'updated_at']
             )
-            if not created:
-                subscription.filters = filters
-                subscription.save()
             return subscription
     
     @database_sync_to_async
@@ -180,23 +345,30 @@ class BaseAPRSConsumer(AsyncWebsocketConsumer):
             self.connection_record.filter_bounds = filters
             self.connection_record.save()
     
+    def get_header(self, name):
+        """Get a raw request header value by lowercase bytes name, or None"""
+        for key, value in self.scope.get('headers', ()):
+            if key == name:
+                return value
+        return None
+    
     def get_client_ip(self):
         """Get client IP address"""
-        headers = dict(self.scope.get('headers', []))
-        x_forwarded_for = headers.get(b'x-forwarded-for')
-        if x_forwarded_for:
-            return x_forwarded_for.decode('utf-8').split(',')[0]
-        client = self.scope.get('client', ['unknown', None])
-        return client[0] if client else 'unknown'
+        if self._client_ip is None:
+            x_forwarded_for = self.get_header(b'x-forwarded-for')
+            if x_forwarded_for:
+                self._client_ip = x_forwarded_for.decode('utf-8', 'ignore').split(',', 1)[0].strip()
+            else:
+                client = self.scope.get('client', ['unknown', None])
+                self._client_ip = client[0] if client else 'unknown'
+        return self._client_ip
     
     def get_user_agent(self):
         """Get client user agent"""
-        headers = dict(self.scope.get('headers', []))
-        user_agent = headers.get(b'user-agent')
-        if user_agent:
-            return user_agent.decode('utf-8')
-        return 'unknown'
-
+        if self._user_agent is None:
+            user_agent = self.get_header(b'user-agent')
+            self._user_agent = user_agent.decode('utf-8', 'ignore') if user_agent else 'unknown'
+        return self._user_agent
 
 class APRSConsumer(BaseAPRSConsumer):
     """Consumer for APRS packet data"""
@@ -204,6 +376,20 @@ class APRSConsumer(BaseAPRSConsumer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.group_name = 'aprs_packets'
+        self.aprsis_key = None
+    
+    async def disconnect(self, close_code):
+        """Let go of any shared APRS-IS connection before leaving"""
+        await self.release_aprsis()
+        await super().disconnect(close_code)
+    
+    async def release_aprsis(self):
+        """Release this consumer's hold on its APRS-IS connection"""
+        if self.aprsis_key is None:
+            return
+        from .aprs_service import get_aprs_services
+        key, self.aprsis_key = self.aprsis_key, None
+        await get_aprs_services().release(key)
     
     async def handle_custom_message(self, data):
         """Handle APRS-IS connection requests"""
@@ -226,15 +412,16 @@ class APRSConsumer(BaseAPRSConsumer):
                     await self.send_error(f"Missing required field: {field}")
                     return
             
-            # Import and start APRS-IS connection
-            from .aprs_service import aprs_service
-            await self.run_in_thread(aprs_service.connect, user_settings)
+            # Join (or start) the shared connection for these settings,
+            # dropping any connection this consumer held before
+            from .aprs_service import get_aprs_services
+            aprs_services = get_aprs_services()
+            previous_key = self.aprsis_key
+            self.aprsis_key = await aprs_services.acquire(user_settings)
+            if previous_key is not None:
+                await aprs_services.release(previous_key)
             
-            await self.send(text_data=json.dumps({
-                'type': 'aprsis_connecting',
-                'message': 'Connecting to APRS-IS...',
-                'timestamp': timezone.now().isoformat()
-            }))
+            await self.send(text_data=APRSIS_CONNECTING_FRAME % _now_json())
             
         except Exception as e:
             logger.error(f"Error handling APRS-IS connect: {e}")
@@ -243,67 +430,65 @@ class APRSConsumer(BaseAPRSConsumer):
     async def handle_aprsis_disconnect(self, data):
         """Handle APRS-IS disconnection request"""
         try:
-            from .aprs_service import aprs_service
-            await self.run_in_thread(aprs_service.disconnect)
+            await self.release_aprsis()
             
-            await self.send(text_data=json.dumps({
-                'type': 'aprsis_disconnected',
-                'message': 'Disconnected from APRS-IS',
-                'timestamp': timezone.now().isoformat()
-            }))
+            await self.send(text_data=APRSIS_DISCONNECTED_FRAME % _now_json())
             
         except Exception as e:
             logger.error(f"Error handling APRS-IS disconnect: {e}")
             await self.send_error(f"Failed to disconnect from APRS-IS: {str(e)}")
     
-    async def run_in_thread(self, func, *args, **kwargs):
-        """Run a blocking function in a thread"""
-        import asyncio
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, func, *args, **kwargs)
-    
     async def connection_status(self, event):
         """Handle connection status broadcast"""
-        await self.send(text_data=json.dumps({
+        if await self.send_prerendered(event):
+            return
+        await self.send_json({
             'type': 'aprsis_status',
             'connected': event['connected'],
             'error': event.get('error'),
-            'timestamp': event.get('timestamp', timezone.now().isoformat())
-        }))
+            'timestamp': event.get('timestamp') or _now()
+        })
         
-    async def send_initial_data(self):
-        """Send recent APRS packets"""
+    async def get_initial_data(self):
+        """Recent APRS packets"""
         packets = await self.get_recent_packets()
-        await self.send(text_data=json.dumps({
+        return {
             'type': 'initial_packets',
             'packets': packets,
-            'timestamp': timezone.now().isoformat()
-        }))
+            'timestamp': _now()
+        }
     
     async def packet_update(self, event):
         """Handle packet update broadcast"""
-        await self.send(text_data=json.dumps({
+        self.invalidate_initial_data()
+        if await self.send_prerendered(event):
+            return
+        await self.send_json({
             'type': 'packet_update',
             'packet': event['packet'],
-            'timestamp': timezone.now().isoformat()
-        }))
-    
-    @database_sync_to_async
+            'timestamp': event.get('timestamp') or _now()
+        })
+    
+    async def packet_batch_update(self, event):
+        """Handle batched packet broadcast"""
+        self.invalidate_initial_data()
+        if await self.send_prerendered(event):
+            return
+        await self.send_json({
+            'type': 'packet_batch_update',
+            'packets': event['packets'],
+            'timestamp': event.get('timestamp') or _now()
+        })
+    
+    @database_read_to_async
     def get_recent_packets(self, limit=100):
-        """Get recent APRS packets"""
-        packets = APRSPacket.objects.select_related().order_by('-timestamp')[:limit]
-        return [self.serialize_packet(packet) for packet in packets]
-    
-    def serialize_packet(self, packet):
-        """Serialize packet for JSON transmission"""
-        return {
-            'id': packet.id,
-            'source_callsign': packet.source_callsign,
-            'packet_type': packet.packet_type,
-            'timestamp': packet.timestamp.isoformat(),
-            'raw_packet': packet.raw_packet,
-            'parsed_data': packet.parsed_data,
-        }
+        """Get recent APRS packets as JSON-ready dicts"""
+        return list(
+            APRSPacket.objects.order_by('-timestamp').values(
+                'id', 'source_callsign', 'packet_type', 'timestamp',
+                'raw_packet', 'parsed_data'
+            )[:limit]
+        )
 
 
 class StationConsumer(BaseAPRSConsumer):
@@ -313,43 +498,48 @@ class StationConsumer(BaseAPRSConsumer):
         super().__init__(*args, **kwargs)
         self.group_name = 'stations'
     
-    async def send_initial_data(self):
-        """Send current station list"""
+    async def get_initial_data(self):
+        """Current station list"""
         stations = await self.get_active_stations()
-        await self.send(text_data=json.dumps({
+        return {
             'type': 'initial_stations',
             'stations': stations,
-            'timestamp': timezone.now().isoformat()
-        }))
+            'timestamp': _now()
+        }
     
     async def station_update(self, event):
         """Handle station update broadcast"""
-        await self.send(text_data=json.dumps({
+        self.invalidate_initial_data()
+        if await self.send_prerendered(event):
+            return
+        await self.send_json({
             'type': 'station_update',
             'station': event['station'],
-            'timestamp': timezone.now().isoformat()
-        }))
-    
-    @database_sync_to_async
+            'timestamp': event.get('timestamp') or _now()
+        })
+    
+    async def station_batch_update(self, event):
+        """Handle batched station broadcast"""
+        self.invalidate_initial_data()
+        if await self.send_prerendered(event):
+            return
+        await self.send_json({
+            'type': 'station_batch_update',
+            'stations': event['stations'],
+            'timestamp': event.get('timestamp') or _now()
+        })
+    
+    @database_read_to_async
     def get_active_stations(self):
-        """Get active stations"""
-        stations = Station.objects.filter(is_active=True).order_by('-last_heard')
-        return [self.serialize_station(station) for station in stations]
-    
-    def serialize_station(self, station):
-        """Serialize station for JSON transmission"""
-        return {
-            'id': station.id,
-            'callsign': station.callsign,
-            'station_type': station.station_type,
-            'symbol_table': station.symbol_table,
-            'symbol_code': station.symbol_code,
-            'emoji_symbol': station.emoji_symbol,
-            'last_heard': station.last_heard.isoformat() if station.last_heard else None,
-            'latitude': station.latitude,
-            'longitude': station.longitude,
-            'last_comment': station.last_comment,
-        }
+        """Get active stations as JSON-ready dicts"""
+        stations = Station.objects.filter(is_active=True).order_by('-last_heard').values(
+            'id', 'callsign', 'station_type', 'symbol_table', 'symbol_code',
+            'last_heard', 'latitude', 'longitude', 'last_comment'
+        )
+        stations = list(stations)
+        for station in stations:
+            station['emoji_symbol'] = Station.symbol_emoji(station['symbol_table'], station['symbol_code'])
+        return stations
 
 
 class WeatherConsumer(BaseAPRSConsumer):
@@ -359,73 +549,64 @@ class WeatherConsumer(BaseAPRSConsumer):
         super().__init__(*args, **kwargs)
         self.group_name = 'weather'
     
-    async def send_initial_data(self):
-        """Send current weather data"""
-        observations = await self.get_recent_observations()
-        alerts = await self.get_active_alerts()
+    async def get_initial_data(self):
+        """Current weather data"""
+        # Both reads run on the thread pool, so issue them together
+        observations, alerts = await asyncio.gather(
+            self.get_recent_observations(),
+            self.get_active_alerts()
+        )
         
-        await self.send(text_data=json.dumps({
+        return {
             'type': 'initial_weather',
             'observations': observations,
             'alerts': alerts,
-            'timestamp': timezone.now().isoformat()
-        }))
+            'timestamp': _now()
+        }
     
     async def weather_update(self, event):
         """Handle weather update broadcast"""
-        await self.send(text_data=json.dumps({
+        self.invalidate_initial_data()
+        if await self.send_prerendered(event):
+            return
+        await self.send_json({
             'type': 'weather_update',
             'data': event['data'],
-            'timestamp': timezone.now().isoformat()
-        }))
+            'timestamp': event.get('timestamp') or _now()
+        })
     
     async def weather_alert(self, event):
         """Handle weather alert broadcast"""
-        await self.send(text_data=json.dumps({
+        self.invalidate_initial_data()
+        if await self.send_prerendered(event):
+            return
+        await self.send_json({
             'type': 'weather_alert',
             'alert': event['alert'],
-            'timestamp': timezone.now().isoformat()
-        }))
+            'timestamp': event.get('timestamp') or _now()
+        })
     
-    @database_sync_to_async
+    @database_read_to_async
     def get_recent_observations(self, limit=50):
-        """Get recent weather observations"""
-        observations = WeatherObservation.objects.select_related('station').order_by('-observation_time')[:limit]
-        return [self.serialize_observation(obs) for obs in observations]
-    
-    @database_sync_to_async
+        """Get recent weather observations as JSON-ready dicts"""
+        observations = WeatherObservation.objects.order_by('-observation_time').values(
+            'id', 'station__station_id', 'observation_time', 'temperature', 'humidity',
+            'pressure', 'wind_speed', 'wind_direction', 'precipitation_1h'
+        )[:limit]
+        return [
+            {'station_id': obs.pop('station__station_id'), **obs}
+            for obs in observations
+        ]
+    
+    @database_read_to_async
     def get_active_alerts(self):
-        """Get active weather alerts"""
-        alerts = WeatherAlert.objects.filter(is_active=True, is_cancelled=False)
-        return [self.serialize_alert(alert) for alert in alerts]
-    
-    def serialize_observation(self, observation):
-        """Serialize weather observation for JSON transmission"""
-        return {
-            'id': observation.id,
-            'station_id': observation.station.station_id,
-            'observation_time': observation.observation_time.isoformat(),
-            'temperature': observation.temperature,
-            'humidity': observation.humidity,
-            'pressure': observation.pressure,
-            'wind_speed': observation.wind_speed,
-            'wind_direction': observation.wind_direction,
-            'precipitation_1h': observation.precipitation_1h,
-        }
-    
-    def serialize_alert(self, alert):
-        """Serialize weather alert for JSON transmission"""
-        return {
-            'id': alert.id,
-            'alert_id': alert.alert_id,
-            'alert_type': alert.alert_type,
-            'event_type': alert.event_type,
-            'title': alert.title,
-            'description': alert.description,
-            'severity': alert.severity,
-            'effective_at': alert.effective_at.isoformat(),
-            'expires_at': alert.expires_at.isoformat(),
-        }
+        """Get active weather alerts as JSON-ready dicts"""
+        return list(
+            WeatherAlert.objects.filter(is_active=True, is_cancelled=False).values(
+                'id', 'alert_id', 'alert_type', 'event_type', 'title',
+                'description', 'severity', 'effective_at', 'expires_at'
+            )
+        )
 
 
 class RadarConsumer(BaseAPRSConsumer):
@@ -435,39 +616,41 @@ class RadarConsumer(BaseAPRSConsumer):
         super().__init__(*args, **kwargs)
         self.group_name = 'radar'
     
-    async def send_initial_data(self):
-        """Send current radar data"""
+    async def get_initial_data(self):
+        """Current radar data"""
         sweeps = await self.get_latest_sweeps()
-        await self.send(text_data=json.dumps({
+        return {
             'type': 'initial_radar',
             'sweeps': sweeps,
-            'timestamp': timezone.now().isoformat()
-        }))
+            'timestamp': _now()
+        }
     
     async def radar_update(self, event):
         """Handle radar update broadcast"""
-        await self.send(text_data=json.dumps({
+        self.invalidate_initial_data()
+        if await self.send_prerendered(event):
+            return
+        await self.send_json({
             'type': 'radar_update',
             'sweep': event['sweep'],
-            'timestamp': timezone.now().isoformat()
-        }))
+            'timestamp': event.get('timestamp') or _now()
+        })
     
-    @database_sync_to_async
+    @database_read_to_async
     def get_latest_sweeps(self, limit=10):
-        """Get latest radar sweeps"""
-        sweeps = RadarSweep.objects.select_related('site', 'product').order_by('-sweep_time')[:limit]
-        return [self.serialize_sweep(sweep) for sweep in sweeps]
-    
-    def serialize_sweep(self, sweep):
-        """Serialize radar sweep for JSON transmission"""
-        return {
-            'id': sweep.id,
-            'site_id': sweep.site.site_id,
-            'product_code': sweep.product.product_code,
-            'sweep_time': sweep.sweep_time.isoformat(),
-            'elevation_angle': sweep.elevation_angle,
-            'data_url': sweep.data_url,
-        }
+        """Get latest radar sweeps as JSON-ready dicts"""
+        sweeps = RadarSweep.objects.order_by('-sweep_time').values(
+            'id', 'site__site_id', 'product__product_code', 'sweep_time',
+            'elevation_angle', 'data_url'
+        )[:limit]
+        return [
+            {
+                'site_id': sweep.pop('site__site_id'),
+                'product_code': sweep.pop('product__product_code'),
+                **sweep
+            }
+            for sweep in sweeps
+        ]
 
 
 class MessageConsumer(BaseAPRSConsumer):
@@ -477,22 +660,25 @@ class MessageConsumer(BaseAPRSConsumer):
         super().__init__(*args, **kwargs)
         self.group_name = 'messages'
     
-    async def send_initial_data(self):
-        """Send recent messages"""
+    async def get_initial_data(self):
+        """Recent messages"""
         messages = await self.get_recent_messages()
-        await self.send(text_data=json.dumps({
+        return {
             'type': 'initial_messages',
             'messages': messages,
-            'timestamp': timezone.now().isoformat()
-        }))
+            'timestamp': _now()
+        }
     
     async def message_update(self, event):
         """Handle message update broadcast"""
-        await self.send(text_data=json.dumps({
+        self.invalidate_initial_data()
+        if await self.send_prerendered(event):
+            return
+        await self.send_json({
             'type': 'message_update',
             'message': event['message'],
-            'timestamp': timezone.now().isoformat()
-        }))
+            'timestamp': event.get('timestamp') or _now()
+        })
     
     async def handle_custom_message(self, data):
         """Handle custom message sending"""
@@ -502,28 +688,21 @@ class MessageConsumer(BaseAPRSConsumer):
     async def send_aprs_message(self, data):
         """Send APRS message"""
         # This would integrate with the APRS message sending system
-        await self.send(text_data=json.dumps({
-            'type': 'message_sent',
-            'message_id': data.get('message_id'),
-            'status': 'sent',
-            'timestamp': timezone.now().isoformat()
-        }))
+        await self.send(text_data=MESSAGE_SENT_FRAME % (_json(data.get('message_id')), _now_json()))
     
-    @database_sync_to_async
+    @database_read_to_async
     def get_recent_messages(self, limit=100):
-        """Get recent APRS messages"""
+        """Get recent APRS messages as JSON-ready dicts"""
         from packets.models import MessagePacket
-        messages = MessagePacket.objects.select_related('packet').order_by('-packet__timestamp')[:limit]
-        return [self.serialize_message(msg) for msg in messages]
-    
-    def serialize_message(self, message):
-        """Serialize message for JSON transmission"""
-        return {
-            'id': message.id,
-            'source_callsign': message.packet.source_callsign,
-            'addressee': message.addressee,
-            'message_text': message.message_text,
-            'timestamp': message.packet.timestamp.isoformat(),
-            'is_ack': message.is_ack,
-            'message_number': message.message_number,
-        }
+        messages = MessagePacket.objects.order_by('-packet__timestamp').values(
+            'id', 'packet__source_callsign', 'addressee', 'message_text',
+            'packet__timestamp', 'is_ack', 'message_number'
+        )[:limit]
+        return [
+            {
+                'source_callsign': message.pop('packet__source_callsign'),
+                'timestamp': message.pop('packet__timestamp'),
+                **message
+            }
+            for message in messages
+        ]
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand
+
+from websockets.aprs_service import (
+    APRSIS_HEARTBEAT_INTERVAL, APRSIS_LEASE_TIMEOUT, APRSIS_WORKER_CHANNEL, aprs_services
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Own APRS-IS connections on behalf of web processes (APRSIS_WORKER_PROCESS); '
+        'run exactly one'
+    )
+
+    def handle(self, *args, **options):
+        # Connections held by each web process, and when it was last heard from
+        self.held = {}
+        self.last_seen = {}
+
+        self.stdout.write(self.style.SUCCESS('Starting APRS-IS worker...'))
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Shutting down...'))
+
+    async def serve(self):
+        """Apply acquire/release requests from the channel layer until stopped"""
+        channel_layer = get_channel_layer()
+
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        channel_layer.receive(APRSIS_WORKER_CHANNEL), timeout=APRSIS_HEARTBEAT_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    message = None
+
+                if message is not None:
+                    try:
+                        await self.dispatch(message)
+                    except Exception as e:
+                        logger.error(f"Error handling APRS-IS worker request: {e}")
+
+                await self.expire_leases()
+        finally:
+            await aprs_services.close_all()
+
+    async def dispatch(self, message):
+        message_type = message.get('type')
+        holder = message.get('holder')
+        self.last_seen[holder] = time.monotonic()
+
+        if message_type == 'aprsis.acquire':
+            key = await aprs_services.acquire(message['user_settings'])
+            self.held.setdefault(holder, Counter())[key] += 1
+        elif message_type == 'aprsis.release':
+            key = tuple(message['key'])
+            held = self.held.get(holder)
+            if held and held[key] > 0:
+                held[key] -= 1
+                await aprs_services.release(key)
+        elif message_type == 'aprsis.heartbeat':
+            pass
+        else:
+            logger.warning(f"Unknown APRS-IS worker request: {message_type}")
+
+    async def expire_leases(self):
+        """Release every connection held by web processes whose lease has lapsed"""
+        cutoff = time.monotonic() - APRSIS_LEASE_TIMEOUT
+        for holder in [h for h, seen in self.last_seen.items() if seen < cutoff]:
+            del self.last_seen[holder]
+            held = self.held.pop(holder, Counter())
+            if held:
+                logger.warning(f"APRS-IS worker lease expired for {holder}; releasing its connections")
+            for key, count in held.items():
+                for _ in range(count):
+                    await aprs_services.release(key)
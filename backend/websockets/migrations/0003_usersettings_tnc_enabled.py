@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-15 22:50
+
+import json
+
+from django.db import migrations, models
+
+
+def backfill_tnc_enabled(apps, schema_editor):
+    UserSettings = apps.get_model('websockets', 'UserSettings')
+    enabled_ids = []
+    for pk, tnc_settings in UserSettings.objects.exclude(tnc_settings='').values_list('pk', 'tnc_settings'):
+        try:
+            data = json.loads(tnc_settings)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict) and data.get('enabled'):
+            enabled_ids.append(pk)
+    UserSettings.objects.filter(pk__in=enabled_ids).update(tnc_enabled=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('websockets', '0002_usersettings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersettings',
+            name='tnc_enabled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_tnc_enabled, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-16 00:20
+
+from django.db import migrations
+
+
+def create_filter_bounds_gin(apps, schema_editor):
+    # Bounds are only matched by containment (@>), which jsonb_path_ops
+    # serves with a smaller index than the default operator class
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS connection_filter_bounds_gin '
+        'ON websockets_websocketconnection USING gin (filter_bounds jsonb_path_ops)'
+    )
+
+
+def drop_filter_bounds_gin(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS connection_filter_bounds_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('websockets', '0003_usersettings_tnc_enabled'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_filter_bounds_gin, drop_filter_bounds_gin),
+    ]
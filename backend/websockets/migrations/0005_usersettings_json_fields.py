@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-16 00:30
+
+import json
+
+from django.db import migrations, models
+
+
+def _is_json(value, expected_type):
+    try:
+        return isinstance(json.loads(value), expected_type)
+    except (TypeError, json.JSONDecodeError):
+        return False
+
+
+def normalize_json_text(apps, schema_editor):
+    # Blank or malformed text would fail the column conversion, so replace
+    # it with an empty list/object first
+    UserSettings = apps.get_model('websockets', 'UserSettings')
+    rows = UserSettings.objects.values_list('pk', 'filter_station_types', 'tnc_settings')
+    for pk, filter_station_types, tnc_settings in rows:
+        updates = {}
+        if not _is_json(filter_station_types, list):
+            updates['filter_station_types'] = '[]'
+        if not _is_json(tnc_settings, dict):
+            updates['tnc_settings'] = '{}'
+        if updates:
+            UserSettings.objects.filter(pk=pk).update(**updates)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('websockets', '0004_websocketconnection_filter_bounds_gin'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_json_text, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='usersettings',
+            name='filter_station_types',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='usersettings',
+            name='tnc_settings',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
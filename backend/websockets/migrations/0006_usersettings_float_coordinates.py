@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-15 23:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('websockets', '0005_usersettings_json_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usersettings',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='usersettings',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -8,7 +8,42 @@ real-time subscriptions, and message handling.
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User
-import json
+import threading
+import time
+from datetime import timedelta
+
+# Last-seen times are kept in memory and written to last_activity for all
+# recently active connections at most this often
+ACTIVITY_FLUSH_INTERVAL = 60  # seconds
+_last_seen = {}
+# Connections with a socket open in this process; each flush marks them seen,
+# so quiet but connected sockets are never presumed gone
+_open_connections = set()
+_activity_state = {'flushed_at': 0.0}
+_activity_lock = threading.Lock()
+
+# Active connections not seen for this long are presumed gone; a running
+# process refreshes all of its open connections at every activity flush, so
+# only connections whose process died go this long without an update
+STALE_CONNECTION_AGE = timedelta(minutes=10)
+
+
+class WebSocketConnectionQuerySet(models.QuerySet):
+    """Query helpers for WebSocket connections"""
+    
+    def retire_stale(self, now=None):
+        """
+        Mark active connections not seen within STALE_CONNECTION_AGE as disconnected
+        
+        Catches connections whose process died before disconnect ran;
+        returns the number of connections retired.
+        """
+        if now is None:
+            now = timezone.now()
+        return self.filter(
+            is_active=True,
+            last_activity__lt=now - STALE_CONNECTION_AGE
+        ).update(is_active=False, disconnected_at=now)
 
 
 class WebSocketConnection(models.Model):
@@ -48,6 +83,8 @@ class WebSocketConnection(models.Model):
     messages_sent = models.IntegerField(default=0)
     messages_received = models.IntegerField(default=0)
     
+    objects = WebSocketConnectionQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-connected_at']
         indexes = [
@@ -63,13 +100,55 @@ class WebSocketConnection(models.Model):
         """Mark connection as disconnected"""
         self.is_active = False
         self.disconnected_at = timezone.now()
-        self.save()
+        with _activity_lock:
+            _last_seen.pop(self.pk, None)
+            _open_connections.discard(self.pk)
+        self.save(update_fields=[
+            'is_active', 'disconnected_at', 'last_activity', 'messages_sent', 'messages_received'
+        ])
     
     def update_activity(self):
-        """Update last activity timestamp"""
+        """
+        Update last activity timestamp
+        
+        The write is deferred and shared: pending connections are updated
+        together in one statement once ACTIVITY_FLUSH_INTERVAL has passed.
+        """
         self.last_activity = timezone.now()
-        self.save(update_fields=['last_activity'])
-
+        WebSocketConnection.mark_seen(self.pk, self.last_activity)
+        with _activity_lock:
+            due = time.monotonic() - _activity_state['flushed_at'] >= ACTIVITY_FLUSH_INTERVAL
+        if due:
+            WebSocketConnection.flush_activity()
+    
+    @staticmethod
+    def mark_seen(pk, seen_at=None):
+        """Record that a connection was just active, in memory only"""
+        with _activity_lock:
+            _last_seen[pk] = seen_at or timezone.now()
+    
+    @staticmethod
+    def mark_open(pk):
+        """Record that this process holds the connection's socket open"""
+        now = timezone.now()
+        with _activity_lock:
+            _open_connections.add(pk)
+            _last_seen[pk] = now
+    
+    @classmethod
+    def flush_activity(cls):
+        """Write the last-seen time of every open connection and every one seen since the last flush"""
+        now = timezone.now()
+        with _activity_lock:
+            _last_seen.update(dict.fromkeys(_open_connections, now))
+            seen = list(_last_seen.items())
+            _last_seen.clear()
+            _activity_state['flushed_at'] = time.monotonic()
+        if seen:
+            cls.objects.bulk_update(
+                [cls(pk=pk, last_activity=seen_at) for pk, seen_at in seen],
+                ['last_activity']
+            )
 
 class Subscription(models.Model):
     """Model for client subscriptions to data streams"""
@@ -106,6 +185,7 @@ class Subscription(models.Model):
     messages_sent = models.IntegerField(default=0)
     last_message_sent = models.DateTimeField(null=True, blank=True)
     
+    
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -220,9 +300,45 @@ class ConnectionStats(models.Model):
         return f"Stats for {self.connection.connection_id}"
     
     def update_stats(self):
-        """Update statistics from connection data"""
-        # This would calculate and update statistics
-        pass
+        """Recompute the derived averages from the running totals"""
+        if self.session_count:
+            self.average_session_duration = self.total_connect_time / self.session_count
+        minutes = self.total_connect_time.total_seconds() / 60
+        if minutes > 0:
+            total_messages = self.total_messages_sent + self.total_messages_received
+            self.average_messages_per_minute = total_messages / minutes
+    
+    @classmethod
+    def record_session(cls, connection, messages_sent=0, messages_received=0,
+                       bytes_sent=0, bytes_received=0, message_errors=0):
+        """
+        Write the stats row for a finished connection in one statement
+        
+        Consumers count traffic in memory and call this once on disconnect
+        rather than touching the row per message.
+        """
+        ended_at = connection.disconnected_at or timezone.now()
+        stats = cls(
+            connection=connection,
+            total_connect_time=ended_at - connection.connected_at,
+            session_count=1,
+            total_messages_sent=messages_sent,
+            total_messages_received=messages_received,
+            bytes_sent=bytes_sent,
+            bytes_received=bytes_received,
+            message_errors=message_errors
+        )
+        stats.update_stats()
+        cls.objects.bulk_create(
+            [stats],
+            update_conflicts=True,
+            unique_fields=['connection'],
+            update_fields=[
+                'total_connect_time', 'average_session_duration', 'session_count',
+                'total_messages_sent', 'total_messages_received', 'average_messages_per_minute',
+                'bytes_sent', 'bytes_received', 'message_errors', 'updated_at'
+            ]
+        )
 
 
 class SystemMessage(models.Model):
@@ -284,8 +400,8 @@ class UserSettings(models.Model):
     auto_generate_passcode = models.BooleanField(default=True)
     
     # Location Settings
-    latitude = models.DecimalField(max_digits=10, decimal_places=7, null=True, blank=True)
-    longitude = models.DecimalField(max_digits=10, decimal_places=7, null=True, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
     location_source = models.CharField(max_length=20, default='manual')  # 'gps', 'manual', 'map'
     
     # Display Settings
@@ -294,12 +410,13 @@ class UserSettings(models.Model):
     
     # APRS-IS Filter Settings
     filter_distance_range = models.IntegerField(default=100)
-    filter_station_types = models.TextField(blank=True)  # JSON array
+    filter_station_types = models.JSONField(default=list, blank=True)
     filter_enable_weather = models.BooleanField(default=True)
     filter_enable_messages = models.BooleanField(default=True)
     
-    # TNC Settings (stored as JSON)
-    tnc_settings = models.TextField(blank=True)  # JSON object
+    # TNC Settings
+    tnc_settings = models.JSONField(default=dict, blank=True)
+    tnc_enabled = models.BooleanField(default=False)  # Mirrors tnc_settings['enabled']
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -313,30 +430,37 @@ class UserSettings(models.Model):
     def __str__(self):
         return f"Settings for {self.callsign or self.session_key}"
 
+    def save(self, *args, **kwargs):
+        """Keep the denormalized tnc_enabled column in sync with tnc_settings"""
+        self.tnc_enabled = self.is_tnc_enabled(self.tnc_settings)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'tnc_settings' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'tnc_enabled'}
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def is_tnc_enabled(tnc_settings):
+        """Value of the tnc_enabled column for a tnc_settings value"""
+        return isinstance(tnc_settings, dict) and bool(tnc_settings.get('enabled', False))
+
     def get_location(self):
         """Get location as dict"""
         if self.latitude and self.longitude:
             return {
-                'latitude': float(self.latitude),
-                'longitude': float(self.longitude),
+                'latitude': self.latitude,
+                'longitude': self.longitude,
                 'source': self.location_source
             }
         return None
 
     def get_tnc_settings(self):
         """Get TNC settings as dict"""
-        if self.tnc_settings:
-            try:
-                return json.loads(self.tnc_settings)
-            except json.JSONDecodeError:
-                return {}
-        return {}
+        return self.tnc_settings if isinstance(self.tnc_settings, dict) else {}
+
+    def tnc_get(self, key, default=None):
+        """Get a single TNC setting"""
+        return self.get_tnc_settings().get(key, default)
 
     def get_filter_station_types(self):
         """Get filter station types as list"""
-        if self.filter_station_types:
-            try:
-                return json.loads(self.filter_station_types)
-            except json.JSONDecodeError:
-                return []
-        return []
+        return self.filter_station_types if isinstance(self.filter_station_types, list) else []
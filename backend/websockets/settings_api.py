@@ -1,120 +1,181 @@
 # User Settings API Endpoints
-from rest_framework.decorators import api_view
-from rest_framework.response import Response
-from rest_framework import status
-from django.http import JsonResponse
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
-import json
+from django.views.decorators.http import require_http_methods
 import logging
+import orjson
 from .models import UserSettings
 
 logger = logging.getLogger(__name__)
 
-@csrf_exempt
-@api_view(['GET', 'POST'])
-def user_settings(request):
-    """
-    Get or save user settings
-    """
+
+def _json_response(payload, status=200):
+    """JSON response encoded with orjson"""
+    return HttpResponse(orjson.dumps(payload), content_type='application/json', status=status)
+
+
+# Encoded GET responses are cached per session for this long
+SETTINGS_CACHE_TIMEOUT = 300  # seconds
+
+# Largest settings POST body accepted; real payloads are a few KB
+SETTINGS_MAX_BODY_SIZE = 16 * 1024  # bytes
+
+
+def _content_length(request):
     try:
-        if request.method == 'GET':
-            # Get settings for the user (using session or user ID)
-            session_key = request.session.session_key or 'default'
-            
-            # If no session key, create one
-            if not request.session.session_key:
-                request.session.save()
-                session_key = request.session.session_key or 'default'
-            
-            try:
-                settings_obj = UserSettings.objects.get(session_key=session_key)
-                return JsonResponse({
-                    'success': True,
-                    'settings': {
-                        'callsign': settings_obj.callsign,
-                        'ssid': settings_obj.ssid,
-                        'passcode': settings_obj.passcode,
-                        'location': {
-                            'latitude': float(settings_obj.latitude),
-                            'longitude': float(settings_obj.longitude),
-                            'source': settings_obj.location_source
-                        } if settings_obj.latitude and settings_obj.longitude else None,
-                        'autoGeneratePasscode': settings_obj.auto_generate_passcode,
-                        'distanceUnit': settings_obj.distance_unit,
-                        'darkTheme': settings_obj.dark_theme,
-                        'aprsIsConnected': False,  # Always start disconnected
-                        'aprsIsFilters': {
-                            'distanceRange': settings_obj.filter_distance_range,
-                            'stationTypes': json.loads(settings_obj.filter_station_types) if settings_obj.filter_station_types else [],
-                            'enableWeather': settings_obj.filter_enable_weather,
-                            'enableMessages': settings_obj.filter_enable_messages
-                        },
-                        'tncSettings': json.loads(settings_obj.tnc_settings) if settings_obj.tnc_settings else {}
-                    }
-                })
-            except UserSettings.DoesNotExist:
-                # Return null when no settings exist for this session
-                return JsonResponse({
-                    'success': True,
-                    'settings': None
-                })
+        return int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return 0
+
+
+def _settings_cache_key(session_key):
+    return f'usersettings:{session_key}'
+
+
+def _serialize_settings(session_key):
+    """Settings for a session in the client's shape, or None when none are saved"""
+    row = UserSettings.objects.filter(session_key=session_key).values(
+        'callsign', 'ssid', 'passcode', 'latitude', 'longitude', 'location_source',
+        'auto_generate_passcode', 'distance_unit', 'dark_theme', 'filter_distance_range',
+        'filter_station_types', 'filter_enable_weather', 'filter_enable_messages', 'tnc_settings'
+    ).first()
+    if row is None:
+        return None
+    station_types = row['filter_station_types']
+    tnc_settings = row['tnc_settings']
+    return {
+        'callsign': row['callsign'],
+        'ssid': row['ssid'],
+        'passcode': row['passcode'],
+        'location': {
+            'latitude': row['latitude'],
+            'longitude': row['longitude'],
+            'source': row['location_source']
+        } if row['latitude'] and row['longitude'] else None,
+        'autoGeneratePasscode': row['auto_generate_passcode'],
+        'distanceUnit': row['distance_unit'],
+        'darkTheme': row['dark_theme'],
+        'aprsIsConnected': False,  # Always start disconnected
+        'aprsIsFilters': {
+            'distanceRange': row['filter_distance_range'],
+            'stationTypes': station_types if isinstance(station_types, list) else [],
+            'enableWeather': row['filter_enable_weather'],
+            'enableMessages': row['filter_enable_messages']
+        },
+        'tncSettings': tnc_settings if isinstance(tnc_settings, dict) else {}
+    }
+
+
+def _get_settings(request):
+    """Return the saved settings for the current session"""
+    try:
+        # Settings are saved per session, and a session is only created
+        # by saving; without one there is nothing to return
+        session_key = request.session.session_key
+        if not session_key:
+            return _json_response({
+                'success': True,
+                'settings': None
+            })
         
-        elif request.method == 'POST':
-            # Save settings
-            data = json.loads(request.body)
-            session_key = request.session.session_key or 'default'
-            
-            # Ensure session key exists
-            if not request.session.session_key:
-                request.session.save()
-                session_key = request.session.session_key
-            
-            settings_data = data.get('settings', {})
-            
-            # Get or create settings object
-            settings_obj, created = UserSettings.objects.get_or_create(
-                session_key=session_key,
-                defaults={}
-            )
-            
-            # Update settings
-            settings_obj.callsign = settings_data.get('callsign', '')
-            settings_obj.ssid = settings_data.get('ssid', 0)
-            settings_obj.passcode = settings_data.get('passcode', -1)
-            
-            location = settings_data.get('location')
-            if location:
-                settings_obj.latitude = location.get('latitude')
-                settings_obj.longitude = location.get('longitude')
-                settings_obj.location_source = location.get('source', 'manual')
-            
-            settings_obj.auto_generate_passcode = settings_data.get('autoGeneratePasscode', True)
-            settings_obj.distance_unit = settings_data.get('distanceUnit', 'km')
-            settings_obj.dark_theme = settings_data.get('darkTheme', False)
-            
-            # APRS-IS filters
-            filters = settings_data.get('aprsIsFilters', {})
-            settings_obj.filter_distance_range = filters.get('distanceRange', 100)
-            settings_obj.filter_station_types = json.dumps(filters.get('stationTypes', []))
-            settings_obj.filter_enable_weather = filters.get('enableWeather', True)
-            settings_obj.filter_enable_messages = filters.get('enableMessages', True)
-            
-            # TNC settings
-            tnc_settings = settings_data.get('tncSettings', {})
-            settings_obj.tnc_settings = json.dumps(tnc_settings)
-            
-            settings_obj.save()
-            
-            logger.info(f"Settings saved for session {session_key}")
-            
-            return JsonResponse({
+        # Serve the encoded response from the cache; saving invalidates it
+        cache_key = _settings_cache_key(session_key)
+        body = cache.get(cache_key)
+        if body is None:
+            body = orjson.dumps({
                 'success': True,
-                'message': 'Settings saved successfully'
+                'settings': _serialize_settings(session_key)
             })
-            
+            cache.set(cache_key, body, SETTINGS_CACHE_TIMEOUT)
+        return HttpResponse(body, content_type='application/json')
     except Exception as e:
-        logger.error(f"Error handling settings request: {e}")
-        return JsonResponse({
+        logger.error(f"Error loading settings: {e}")
+        return _json_response({
             'success': False,
             'error': str(e)
         }, status=500)
+
+
+def _save_settings(request):
+    """Save settings for the current session, creating the session if needed"""
+    try:
+        # Refuse oversized bodies before reading or parsing them
+        if _content_length(request) > SETTINGS_MAX_BODY_SIZE:
+            return _json_response({
+                'success': False,
+                'error': 'Settings payload too large'
+            }, status=413)
+        
+        # Save settings
+        data = orjson.loads(request.body)
+        # Ensure session key exists
+        session_key = request.session.session_key
+        if not session_key:
+            request.session.save()
+            session_key = request.session.session_key
+        
+        settings_data = data.get('settings', {})
+        
+        filters = settings_data.get('aprsIsFilters', {})
+        defaults = {
+            'callsign': settings_data.get('callsign', ''),
+            'ssid': settings_data.get('ssid', 0),
+            'passcode': settings_data.get('passcode', -1),
+            'auto_generate_passcode': settings_data.get('autoGeneratePasscode', True),
+            'distance_unit': settings_data.get('distanceUnit', 'km'),
+            'dark_theme': settings_data.get('darkTheme', False),
+            # APRS-IS filters
+            'filter_distance_range': filters.get('distanceRange', 100),
+            'filter_station_types': filters.get('stationTypes', []),
+            'filter_enable_weather': filters.get('enableWeather', True),
+            'filter_enable_messages': filters.get('enableMessages', True),
+            # TNC settings
+            'tnc_settings': settings_data.get('tncSettings', {}),
+        }
+        
+        # A saved location is kept unless a new one is sent
+        location = settings_data.get('location')
+        if location:
+            defaults['latitude'] = location.get('latitude')
+            defaults['longitude'] = location.get('longitude')
+            defaults['location_source'] = location.get('source', 'manual')
+        
+        # A targeted UPDATE of only these columns; the first save for a
+        # session matches no row and inserts it instead. If a concurrent
+        # first save wins the insert, update the row it created.
+        defaults['tnc_enabled'] = UserSettings.is_tnc_enabled(defaults['tnc_settings'])
+        rows = UserSettings.objects.filter(session_key=session_key)
+        if not rows.update(updated_at=timezone.now(), **defaults):
+            try:
+                with transaction.atomic():
+                    UserSettings.objects.create(session_key=session_key, **defaults)
+            except IntegrityError:
+                rows.update(updated_at=timezone.now(), **defaults)
+        cache.delete(_settings_cache_key(session_key))
+        
+        logger.info(f"Settings saved for session {session_key}")
+        
+        return _json_response({
+            'success': True,
+            'message': 'Settings saved successfully'
+        })
+    except Exception as e:
+        logger.error(f"Error saving settings: {e}")
+        return _json_response({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+def user_settings(request):
+    """
+    Get or save user settings
+    """
+    if request.method == 'GET':
+        return _get_settings(request)
+    return _save_settings(request)
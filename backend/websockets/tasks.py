@@ -0,0 +1,21 @@
+"""
+WebSocket Tasks
+
+Periodic maintenance for WebSocket connection records.
+"""
+
+import logging
+
+from celery import shared_task
+
+from .models import WebSocketConnection
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def retire_stale_connections():
+    """Mark connections that stopped reporting activity as disconnected"""
+    retired = WebSocketConnection.objects.retire_stale()
+    if retired:
+        logger.info(f"Retired {retired} stale WebSocket connections")
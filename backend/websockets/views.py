@@ -1,22 +1,37 @@
+from functools import lru_cache
+
+import orjson
+from django.http import HttpResponse
 from django.shortcuts import render
-from rest_framework.decorators import api_view
-from rest_framework.response import Response
 from django.utils import timezone
+from django.views.decorators.http import require_GET
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
 # Create your views here.
 
-@api_view(['GET'])
-def websocket_status(request):
-    """Get WebSocket connection status"""
+@lru_cache(maxsize=1)
+def _channel_layer_info():
+    """Whether a channel layer is configured, and its type; fixed per process"""
     channel_layer = get_channel_layer()
+    return channel_layer is not None, str(type(channel_layer)) if channel_layer else None
+
+
+@require_GET
+def websocket_status(request):
+    """
+    Get WebSocket connection status
+    
+    A plain Django view: the payload is fixed-shape JSON, so DRF's content
+    negotiation and renderer selection are skipped.
+    """
+    websocket_enabled, channel_layer_type = _channel_layer_info()
     
     # Basic status info
     status_info = {
-        'websocket_enabled': channel_layer is not None,
+        'websocket_enabled': websocket_enabled,
         'timestamp': timezone.now().isoformat(),
-        'channel_layer_type': str(type(channel_layer)) if channel_layer else None,
+        'channel_layer_type': channel_layer_type,
     }
     
-    return Response(status_info)
+    return HttpResponse(orjson.dumps(status_info), content_type='application/json')
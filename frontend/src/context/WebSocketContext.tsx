@@ -36,6 +36,7 @@ type WebSocketAction =
   | { type: 'UPDATE_STATION'; payload: Station }
   | { type: 'SET_INITIAL_PACKETS'; payload: APRSPacket[] }
   | { type: 'ADD_PACKET'; payload: APRSPacket }
+  | { type: 'ADD_PACKETS'; payload: APRSPacket[] }
   | { type: 'SET_INITIAL_WEATHER'; payload: { observations: WeatherObservation[]; alerts: WeatherAlert[] } }
   | { type: 'UPDATE_WEATHER'; payload: WeatherObservation }
   | { type: 'ADD_WEATHER_ALERT'; payload: WeatherAlert }
@@ -115,6 +116,13 @@ function webSocketReducer(state: WebSocketState, action: WebSocketAction): WebSo
         packets: [action.payload, ...state.packets.slice(0, 99)] // Keep last 100 packets
       };
     
+    case 'ADD_PACKETS':
+      // Batches arrive oldest first; newest packets go to the top
+      return {
+        ...state,
+        packets: [...action.payload.slice().reverse(), ...state.packets].slice(0, 100)
+      };
+    
     case 'SET_INITIAL_WEATHER':
       return {
         ...state,
@@ -330,6 +338,10 @@ export const WebSocketProvider: React.FC<WebSocketProviderProps> = ({ children,
         queueStationUpdate(message.station);
         break;
       
+      case 'station_batch_update':
+        message.stations.forEach(queueStationUpdate);
+        break;
+      
       case 'initial_packets':
         dispatch({ type: 'SET_INITIAL_PACKETS', payload: message.packets });
         break;
@@ -338,6 +350,10 @@ export const WebSocketProvider: React.FC<WebSocketProviderProps> = ({ children,
         dispatch({ type: 'ADD_PACKET', payload: message.packet });
         break;
       
+      case 'packet_batch_update':
+        dispatch({ type: 'ADD_PACKETS', payload: message.packets });
+        break;
+      
       case 'initial_weather':
         dispatch({ 
           type: 'SET_INITIAL_WEATHER', 
@@ -95,6 +95,11 @@ export interface PacketUpdateMessage extends WebSocketMessage {
   packet: APRSPacket;
 }
 
+export interface PacketBatchUpdateMessage extends WebSocketMessage {
+  type: 'packet_batch_update';
+  packets: APRSPacket[];
+}
+
 export interface InitialStationsMessage extends WebSocketMessage {
   type: 'initial_stations';
   stations: Station[];
@@ -105,6 +110,11 @@ export interface StationUpdateMessage extends WebSocketMessage {
   station: Station;
 }
 
+export interface StationBatchUpdateMessage extends WebSocketMessage {
+  type: 'station_batch_update';
+  stations: Station[];
+}
+
 export interface InitialWeatherMessage extends WebSocketMessage {
   type: 'initial_weather';
   observations: WeatherObservation[];